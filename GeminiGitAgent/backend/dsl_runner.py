@@ -0,0 +1,61 @@
+import io
+import sys
+import threading
+
+from git_helper import DSLExecutor, GitHelper
+
+
+class _ThreadStdout:
+    """sys.stdout replacement that sends a thread's writes to its own buffer, if it has one.
+
+    DSL jobs run on pool threads and report through print(); capturing them per
+    thread keeps concurrent jobs and the server's own logging apart, which
+    contextlib.redirect_stdout (process-wide) can't do.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+
+    def capture(self, buffer):
+        self._local.buffer = buffer
+
+    def release(self):
+        self._local.buffer = None
+
+    def write(self, text):
+        buffer = getattr(self._local, "buffer", None)
+        return (buffer or self._stream).write(text)
+
+    def flush(self):
+        buffer = getattr(self._local, "buffer", None)
+        (buffer or self._stream).flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+_stdout = None
+_stdout_lock = threading.Lock()
+
+
+def _install_stdout():
+    global _stdout
+    with _stdout_lock:
+        if _stdout is None:
+            _stdout = sys.stdout = _ThreadStdout(sys.stdout)
+    return _stdout
+
+
+def run_dsl_job(dsl_code, repo_path):
+    """Run a DSL script against repo_path and return its printed output."""
+    stdout = _install_stdout()
+    buffer = io.StringIO()
+    helper = GitHelper(repo_path)
+    stdout.capture(buffer)
+    try:
+        DSLExecutor(helper).execute_source(dsl_code)
+    finally:
+        stdout.release()
+        helper.close()
+    return buffer.getvalue()
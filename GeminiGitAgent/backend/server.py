@@ -1,29 +1,77 @@
+import codecs
+import collections
+import hashlib
+import itertools
 import json
+import operator
 import os
+import posixpath
+import re
+import shutil
+import stat
 import subprocess
 import sys
+import tempfile
+import threading
 import time
-from tempfile import NamedTemporaryFile
+import types
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta, timezone
+from urllib.parse import parse_qs, urlsplit
 
-import requests
+import httpx
 from dotenv import find_dotenv, load_dotenv
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
-from requests import RequestException
+
+try:
+    import orjson  # Faster JSON encode/decode for large GitHub payloads
+except ImportError:
+    orjson = None
+
+try:
+    import xxhash  # Fast non-cryptographic hashing for change fingerprints
+except ImportError:
+    xxhash = None
+
+try:
+    from flask_compress import Compress  # gzip/brotli for larger JSON responses
+except ImportError:
+    Compress = None
 
 load_dotenv(find_dotenv())
 
 # Load config file
 CONFIG_PATH = os.path.join(os.path.dirname(__file__), "../config/app_config.json")
+# Parsed config keyed by the file's (mtime_ns, size) so unchanged files aren't re-read
+config_cache = {"key": None, "data": None}
+config_cache_lock = threading.Lock()
+
 def load_config():
-    """Load configuration from app_config.json"""
+    """Load configuration from app_config.json (cached until the file changes)"""
+    try:
+        st = os.stat(CONFIG_PATH)
+    except OSError:
+        return {}
+
+    key = (st.st_mtime_ns, st.st_size)
+    with config_cache_lock:
+        if config_cache["key"] == key:
+            # Callers update the returned dict before saving, so hand out a copy
+            return dict(config_cache["data"])
+
     try:
-        if os.path.exists(CONFIG_PATH):
-            with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
-                return json.load(f)
+        with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
+            data = json.load(f)
     except Exception as e:
         print(f"Warning: Could not load config file: {e}")
-    return {}
+        return {}
+
+    with config_cache_lock:
+        config_cache["key"] = key
+        config_cache["data"] = data
+    return dict(data)
 
 def save_config(config):
     """Save configuration to app_config.json"""
@@ -31,6 +79,8 @@ def save_config(config):
         os.makedirs(os.path.dirname(CONFIG_PATH), exist_ok=True)
         with open(CONFIG_PATH, 'w', encoding='utf-8') as f:
             json.dump(config, f, indent=2)
+        with config_cache_lock:
+            config_cache["key"] = None  # Force a re-read on next load
         return True
     except Exception as e:
         print(f"Error saving config file: {e}")
@@ -42,16 +92,27 @@ app_config = load_config()
 # Add GitHelper to path
 sys.path.append(os.path.join(os.path.dirname(__file__), "../../GitHelper"))
 import importlib
+import importlib.util
 
 import git_helper
 
 importlib.reload(git_helper)
-from git_helper import DSLExecutor, GitHelper
+from git_helper import GitHelper
 from watcher import RepositoryWatcher
+from dsl_runner import run_dsl_job
 
 app = Flask(__name__)
 CORS(app)
 
+if Compress:
+    app.config["COMPRESS_MIMETYPES"] = ["application/json"]
+    app.config["COMPRESS_LEVEL"] = 5
+    app.config["COMPRESS_MIN_SIZE"] = 1024
+    # Compressing a streamed response buffers the whole generator first, which
+    # defeats streaming (e.g. /api/files); leave streamed bodies uncompressed
+    app.config["COMPRESS_STREAMS"] = False
+    Compress(app)
+
 # Global state
 current_repo_path = None
 git_helper = None
@@ -61,10 +122,170 @@ cached_status = None
 cached_status_hash = None
 last_files_hash = None
 cached_files_list = None
+cached_files_hash = None  # Fingerprint of cached_files_list, used by /api/poll
+cached_files_set = None  # Same paths as cached_files_list, patched in place by the watcher
+files_list_dirty = False  # cached_files_list needs re-sorting from cached_files_set
+files_cache_lock = threading.Lock()
+current_repo_prefix = None  # Resolved repo path + os.sep, used for path checks
+status_map_cache = None  # (timestamp, {path: status_code}) from git status --porcelain=v2
+poll_status_sentinel = None  # ((index, HEAD) mtimes, monotonic time) when /api/poll last read status itself
+poll_state_lock = threading.Lock()  # Guards last_status_hash / last_files_hash updates in /api/poll
+
+# GitHub repo list cache: sha256(token) -> {"pages": [(etag, repos), ...], "payload", "fetched_at"}
+github_repos_cache = {}
+# Last seen GitHub rate limit: sha256(token) -> (remaining, reset_epoch)
+github_rate_limits = {}
+github_repos_lock = threading.Lock()
+# Below this many remaining requests, serve the cached repo list until reset
+GITHUB_RATE_LIMIT_FLOOR = 20
+# Seconds between background refreshes of the repo list cache
+GITHUB_REPOS_REFRESH_INTERVAL = 300
+
+# Background git clone jobs: job_id -> {"state", "path", ...}, oldest first
+CLONE_POOL = ThreadPoolExecutor(max_workers=4)
+MAX_CLONE_JOBS = 50
+CLONE_DEPTH = 100  # Commits fetched by a default (shallow) clone; matches the history view
+clone_jobs = collections.OrderedDict()
+clone_jobs_lock = threading.Lock()
+
+# Background DSL executions: job_id -> {"state", "output"/"error"}, oldest first
+DSL_POOL = ThreadPoolExecutor(max_workers=2)
+MAX_DSL_JOBS = 50
+dsl_jobs = collections.OrderedDict()
+dsl_jobs_lock = threading.Lock()
+
+# Recent commit log for chat prompts, keyed by the HEAD sha it was read at
+recent_log_cache = {"head": None, "value": ""}
+recent_log_lock = threading.Lock()
+
+# Primary language per repo: (path, root mtime_ns) -> (timestamp, language), most recent last
+LANGUAGE_CACHE_SIZE = 32
+LANGUAGE_CACHE_TTL = 300
+language_cache = collections.OrderedDict()
+language_cache_lock = threading.Lock()
+
+# Gemini repo description, keyed by (repo path, HEAD sha) it was generated at
+description_cache = {"key": None, "value": None}
+description_lock = threading.Lock()
+
+# /api/repos scan results, reused while the scanned locations' mtimes are
+# unchanged and the result is younger than REPO_SCAN_TTL seconds
+REPO_SCAN_TTL = 60
+repo_scan_cache = {"key": None, "ts": 0, "result": None}
+# Remote organization per repo found by the last scan: path -> [.git/config mtime_ns, organization]
+repo_org_cache = {}
+repo_scan_lock = threading.Lock()
+
+# Coalesces rapid status lookups from the UI (e.g. diff requests)
+STATUS_MAP_TTL = 1.0
+# Longest /api/poll reuses cached status on an unchanged index/HEAD sentinel; bounds
+# how long a missed watcher event can leave a stale status on screen
+POLL_SENTINEL_MAX_AGE = 10.0
+
+# NUL-separated v2 output: paths are never quoted and every record has a fixed layout
+GIT_STATUS_CMD = ["git", "status", "--porcelain=v2", "-z", "-uall"]
+# Commit counts keyed by HEAD sha: git dir -> (head, count). Kept in memory only,
+# so opening a repository never leaves files behind in it
+commit_count_cache = {}
+
+# Process umask, read once at import while single-threaded (os.umask can only be
+# read by setting it); new files saved atomically get the permissions open() would
+UMASK = os.umask(0)
+os.umask(UMASK)
+
+# Max paths per git invocation when batching file operations
+GIT_PATHSPEC_BATCH = 200
+# Above this many changed paths per watcher event, rescan instead of patching caches
+INCREMENTAL_REFRESH_LIMIT = 100
+
+# Directories left out of the repository file list
+FILES_IGNORE_DIRS = frozenset({".git", "__pycache__", "node_modules", "venv", ".idea", ".vscode"})
+
+# Files sampled for the file-type breakdown in the Gemini repo description
+FILE_TYPES_SAMPLE_SIZE = 500
+
+# Files larger than this are sent as raw text instead of being wrapped in JSON
+FILE_SEND_THRESHOLD = 1024 * 1024
+
+# Gemini change analyses: status hash -> (summary, dsl), most recent last.
+# Pollers that see the same status while a request is in flight share its Future.
+ANALYSIS_CACHE_SIZE = 16
+ANALYSIS_QUIET_WINDOW = 0.15  # Seconds to let concurrent pollers join before calling Gemini
+# Runs analyses for ordinary polls so the request thread doesn't wait on Gemini
+ANALYSIS_POOL = ThreadPoolExecutor(max_workers=2)
+
+# Independent git calls and disk scans behind /api/repo/summary
+SUMMARY_POOL = ThreadPoolExecutor(max_workers=12)
+analysis_cache = collections.OrderedDict()
+analysis_inflight = {}
+analysis_lock = threading.Lock()
+
+# Extracts the organization/user from GitHub remote URLs:
+# - https://github.com/org/repo(.git)
+# - git@github.com:org/repo(.git)
+GITHUB_ORG_RE = re.compile(r"github\.com[:/]([^/]+)/")
+
+# Body of the [remote "origin"] section of a .git/config file
+ORIGIN_SECTION_RE = re.compile(r'^\s*\[remote\s+"origin"\]\s*$(.*?)(?=^\s*\[|\Z)', re.M | re.S)
+CONFIG_URL_RE = re.compile(r"^\s*url\s*=\s*(\S+)", re.M)
+
+# "<count>\t<name> <<email>>" lines from git shortlog -se
+SHORTLOG_AUTHOR_RE = re.compile(r"\s*\d+\s+(.+?)\s+<(.*)>\s*$")
+
+# "author <name> <<email>> <epoch> <+hhmm>" header line of a raw commit object
+COMMIT_AUTHOR_RE = re.compile(r"^author (.*) <[^>]*> (\d+) ([+-])(\d\d)(\d\d)$", re.M)
+
+# Extension -> language table used for primary language detection
+LANG_BY_EXT = types.MappingProxyType({
+    '.py': 'Python',
+    '.js': 'JavaScript',
+    '.ts': 'TypeScript',
+    '.java': 'Java',
+    '.cpp': 'C++',
+    '.c': 'C',
+    '.go': 'Go',
+    '.rs': 'Rust',
+    '.rb': 'Ruby',
+    '.php': 'PHP'
+})
+
+GITHUB_API_URL = "https://api.github.com"
+GITHUB_REPOS_PARAMS = {"per_page": 100, "sort": "updated"}
+# Repo fields returned to the frontend, sent once as "columns" with each repo as a row
+GITHUB_REPO_FIELDS = ("name", "full_name", "private", "html_url", "clone_url", "description", "updated_at")
+get_repo_fields = operator.itemgetter(*GITHUB_REPO_FIELDS)
+
+# Shared GitHub API client: connections are reused across calls and, when the
+# h2 package is installed, concurrent page fetches are multiplexed over HTTP/2
+GH_CLIENT = httpx.Client(
+    headers={"Accept": "application/vnd.github.v3+json"},
+    timeout=httpx.Timeout(10.0, connect=3.0),
+    transport=httpx.HTTPTransport(
+        http2=importlib.util.find_spec("h2") is not None,
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=40),
+        retries=2,
+    ),
+)
 
 GEMINI_MODEL = "gemini-2.0-flash"
 GEMINI_URL = f"https://generativelanguage.googleapis.com/v1beta/models/{GEMINI_MODEL}:generateContent"
 
+# Shared Gemini client so concurrent requests reuse pooled keep-alive connections
+# instead of paying a TCP/TLS handshake per prompt; with h2 installed, prompts
+# from chat and polling arriving together are multiplexed over one connection
+GEMINI_CLIENT = httpx.Client(
+    timeout=httpx.Timeout(45.0, connect=5.0),
+    http2=importlib.util.find_spec("h2") is not None,
+    limits=httpx.Limits(max_keepalive_connections=10, max_connections=32),
+)
+
+# Recent Gemini responses: (prompt digest, mime type, temperature) -> (timestamp, text)
+GEMINI_CACHE_SIZE = 256
+GEMINI_CACHE_TTL = 60
+GEMINI_CACHE_MAX_TEMPERATURE = 0.5  # Sampling above this is meant to vary, so don't cache
+gemini_cache = collections.OrderedDict()
+gemini_cache_lock = threading.Lock()
+
 def get_gemini_api_key():
     """Get Gemini API key from config file first, then fall back to environment variable."""
     # Reload config to get latest
@@ -86,15 +307,46 @@ if not initial_key:
     )
 
 
+def _gemini_cache_get(key):
+    with gemini_cache_lock:
+        entry = gemini_cache.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] > GEMINI_CACHE_TTL:
+            del gemini_cache[key]
+            return None
+        gemini_cache.move_to_end(key)
+        return entry[1]
+
+
+def _gemini_cache_put(key, text):
+    with gemini_cache_lock:
+        gemini_cache[key] = (time.monotonic(), text)
+        gemini_cache.move_to_end(key)
+        while len(gemini_cache) > GEMINI_CACHE_SIZE:
+            gemini_cache.popitem(last=False)
+
+
 def send_gemini_prompt(prompt_text, response_mime_type=None, temperature=0.6):
     """
     Send a prompt to Gemini and return the text response.
     Raises RuntimeError when the API cannot be reached or is misconfigured.
+
+    Identical low-temperature prompts within GEMINI_CACHE_TTL seconds reuse
+    the previous response; higher temperatures always go to the API.
     """
     api_key = get_gemini_api_key()
     if not api_key:
         raise RuntimeError("Gemini API key is not configured. Please set it in Settings.")
 
+    cache_key = None
+    if temperature <= GEMINI_CACHE_MAX_TEMPERATURE:
+        digest = hashlib.blake2b(prompt_text.encode("utf-8"), digest_size=16)
+        cache_key = (digest.digest(), response_mime_type, temperature)
+        cached = _gemini_cache_get(cache_key)
+        if cached is not None:
+            return cached
+
     payload = {
         "contents": [
             {
@@ -114,26 +366,74 @@ def send_gemini_prompt(prompt_text, response_mime_type=None, temperature=0.6):
         payload["generationConfig"]["responseMimeType"] = response_mime_type
 
     try:
-        response = requests.post(
+        response = GEMINI_CLIENT.post(
             GEMINI_URL,
             params={"key": api_key},
             json=payload,
-            timeout=45,
         )
         response.raise_for_status()
-    except RequestException as exc:
+    except httpx.HTTPError as exc:
         raise RuntimeError(f"Gemini API request failed: {exc}") from exc
 
-    data = response.json()
     try:
-        return (
+        data = json_loads(response.content)
+        text = (
             data["candidates"][0]["content"]["parts"][0]
             .get("text", "")
             .strip()
         )
-    except (KeyError, IndexError, AttributeError) as exc:
+    except (ValueError, KeyError, IndexError, AttributeError, TypeError) as exc:
         raise RuntimeError("Gemini API returned an unexpected response.") from exc
 
+    if cache_key is not None:
+        _gemini_cache_put(cache_key, text)
+    return text
+
+
+def json_loads(data):
+    """Decode JSON bytes or text, using orjson when it is installed."""
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def extract_json_object(text):
+    """Decode a JSON object from a Gemini reply, or return None.
+
+    JSON-mode replies parse directly; otherwise the outermost {...} is
+    sliced out, which also drops Markdown code fences around it.
+    """
+    try:
+        parsed = json_loads(text)
+    except ValueError:
+        start, end = text.find("{"), text.rfind("}")
+        if start < 0 or end < start:
+            return None
+        try:
+            parsed = json_loads(text[start:end + 1])
+        except ValueError:
+            return None
+    return parsed if isinstance(parsed, dict) else None
+
+
+def json_response(payload):
+    """Build a JSON response, serializing with orjson when it is installed."""
+    if orjson:
+        return Response(orjson.dumps(payload), mimetype="application/json")
+    return jsonify(payload)
+
+
+def _stream_json_list(key, items, batch_size=1000):
+    """Yield the JSON text of {key: [items...]} in pieces as items are produced."""
+    yield json.dumps(key).join(('{', ':['))
+    separator = ""
+    items = iter(items)
+    while batch := list(itertools.islice(items, batch_size)):
+        # Encode a batch at a time and drop its brackets to splice it into the array
+        yield separator + json.dumps(batch)[1:-1]
+        separator = ","
+    yield "]}"
+
 
 def get_helper():
     global git_helper
@@ -144,60 +444,480 @@ def get_helper():
     return git_helper
 
 
-def update_status_cache():
-    """Update the cached git status. Called by watcher when filesystem changes are detected."""
-    global cached_status, cached_status_hash, cached_files_list
+def _is_dir(path):
+    """Return True if path is a directory, using a single stat call."""
+    try:
+        return stat.S_ISDIR(os.stat(path).st_mode)
+    except OSError:
+        return False
+
+
+def _is_file(path):
+    """Return True if path is a regular file, using a single stat call."""
+    try:
+        return stat.S_ISREG(os.stat(path).st_mode)
+    except OSError:
+        return False
+
+
+def _file_digest(path, chunk_size=64 * 1024):
+    """Return the BLAKE2b digest of a file's contents, or None if it can't be read."""
+    digest = hashlib.blake2b(digest_size=20)
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.digest()
+
+
+def _is_utf8_text(f, chunk_size=64 * 1024):
+    """Return True if the rest of binary file f is NUL-free UTF-8, decoding it in chunks."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    try:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            if b"\0" in chunk:
+                return False
+            decoder.decode(chunk)
+        decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def _iter_text_file(path, chunk_size=64 * 1024):
+    """Yield a UTF-8 file's text in chunks with line endings normalized to \n.
+
+    Text mode's universal newlines handle a \r\n split across two chunks.
+    """
+    with open(path, "r", encoding="utf-8", newline=None) as f:
+        for chunk in iter(lambda: f.read(chunk_size), ""):
+            yield chunk
+
+
+def _write_file_atomic(path, data):
+    """Write bytes to path via a temporary file and os.replace to avoid torn writes."""
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except OSError:
+        mode = 0o666 & ~UMASK  # What a plain open() would have created
+
+    # mkstemp picks a unique name, so concurrent saves of one file (server
+    # threads share a pid) never write into each other's temp file
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(path), prefix=f".{os.path.basename(path)}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def resolve_repo_file(rel_path):
+    """Resolve a repo-relative path to an absolute path inside the current repo.
+
+    Returns None if the path is absolute, contains `..` components, or
+    otherwise escapes the repository root (including through a symlink).
+    """
+    if not current_repo_prefix or not rel_path:
+        return None
+
+    # Cheap rejections before doing any path joining
+    if os.path.isabs(rel_path) or os.path.splitdrive(rel_path)[0]:
+        return None
+    if ".." in rel_path.replace("\\", "/").split("/"):
+        return None
+
+    # realpath follows symlinks, so a link pointing outside the repo is rejected
+    full_path = os.path.realpath(os.path.join(current_repo_prefix, rel_path))
+    if full_path == current_repo_prefix[:-1] or full_path.startswith(current_repo_prefix):
+        return full_path
+    return None
+
+
+def fingerprint(data):
+    """Return a compact, process-independent digest of text or bytes.
+
+    Unlike hash(), the result does not depend on PYTHONHASHSEED, so it can
+    be compared across restarts and worker processes.
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8", errors="surrogateescape")
+    if xxhash:
+        return xxhash.xxh3_64_digest(data)
+    return hashlib.blake2b(data, digest_size=8).digest()
+
+
+def fingerprint_paths(paths):
+    """Return a compact digest of a sorted path list for cheap change detection."""
+    return fingerprint("\0".join(paths))
+
+
+def parse_porcelain_v2(status_output):
+    """Parse `git status --porcelain=v2 -z` output into a {path: XY} dict.
+
+    XY uses the short-format letters (' ' for unchanged, '??' for untracked)
+    so callers can treat it like `git status -s`. Ignored entries are
+    skipped; for renames/copies the destination path is used.
+    """
+    status_map = {}
+    records = iter((status_output or "").split("\0"))
+    for record in records:
+        kind = record[:1]
+        if kind == "1":
+            fields = record.split(" ", 8)
+        elif kind == "2":
+            fields = record.split(" ", 9)
+            next(records, None)  # Original path of the rename/copy
+        elif kind == "u":
+            fields = record.split(" ", 10)
+        elif kind == "?":
+            status_map[record[2:]] = "??"
+            continue
+        else:
+            continue
+        status_map[fields[-1]] = fields[1].replace(".", " ")
+    return status_map
+
+
+def format_short_status(status_map):
+    """Render a parsed status map as `git status -s` lines for the UI and prompts."""
+    return "\n".join(f"{code} {path}" for path, code in status_map.items())
+
+
+def run_git_with_paths(helper, args, paths, batch_size=GIT_PATHSPEC_BATCH):
+    """Run a git argv once per batch of paths and return the joined output.
+
+    Returns None if any batch fails. Batching keeps the command line under
+    the Windows length limit when many files are passed.
+    """
+    outputs = []
+    for i in range(0, len(paths), batch_size):
+        output = helper.run_command(args + paths[i:i + batch_size], strip=False)
+        if output is None:
+            return None
+        outputs.append(output)
+    return "".join(outputs)
+
+
+def read_git_status(helper, paths=None):
+    """Run git status once and return the parsed {path: XY} map, or None on failure.
+
+    paths limits the status to those literal pathspecs.
+    """
+    if paths:
+        status_output = run_git_with_paths(
+            helper, ["git", "--literal-pathspecs", *GIT_STATUS_CMD[1:], "--"], list(paths)
+        )
+    else:
+        status_output = helper.run_command(GIT_STATUS_CMD, strip=False)
+    if status_output is None:
+        return None
+    return parse_porcelain_v2(status_output)
+
+
+def classify_status(status_code):
+    """Map a porcelain status code to 'untracked', 'new' or 'modified'."""
+    if status_code == "??":
+        return "untracked"
+    if status_code.startswith("A") or status_code == " A":
+        return "new"
+    return "modified"
+
+
+def get_status_map(helper, max_age=STATUS_MAP_TTL):
+    """Return the parsed porcelain status, reusing a result younger than max_age seconds."""
+    global status_map_cache
+    now = time.monotonic()
+    if max_age and status_map_cache and now - status_map_cache[0] < max_age:
+        return status_map_cache[1]
+
+    status_map = read_git_status(helper) or {}
+    status_map_cache = (now, status_map)
+    return status_map
+
+
+def _refresh_status_paths(helper, base_map, changed_paths):
+    """Re-run git status for just changed_paths and merge it into base_map.
+
+    Returns the merged map, or None if git failed and a full refresh is needed.
+    """
+    git_paths = sorted({os.path.normpath(p).replace("\\", "/") for p in changed_paths})
+    output = run_git_with_paths(
+        helper,
+        ["git", "--literal-pathspecs", "status", "--porcelain=v2", "-z", "-uall", "--"],
+        git_paths,
+    )
+    if output is None:
+        return None
+
+    changed = set(git_paths)
+    prefixes = tuple(p + "/" for p in git_paths)
+    merged = {
+        path: code for path, code in base_map.items()
+        if path not in changed and not path.startswith(prefixes)
+    }
+    merged.update(parse_porcelain_v2(output))
+    # Keep git's order (tracked entries, then untracked) so the status text is stable
+    return dict(sorted(merged.items(), key=lambda item: (item[1] == "??", item[0])))
+
+
+def _is_gitignore(path):
+    return os.path.basename(os.path.normpath(path)) == ".gitignore"
+
+
+def _can_refresh_incrementally(changed_paths):
+    """True if a pathspec-limited status is enough to bring the cache up to date."""
+    if not changed_paths or status_map_cache is None:
+        return False
+    if len(changed_paths) > INCREMENTAL_REFRESH_LIMIT:
+        return False
+    # Changes under .git (index, HEAD, refs, info/exclude) can affect every path,
+    # and so can a .gitignore at any level: it changes the status of untouched files
+    for p in changed_paths:
+        p = os.path.normpath(p)
+        if p.split(os.sep, 1)[0] == ".git" or _is_gitignore(p):
+            return False
+    # A rename's source and destination may not both be in the pathspec
+    return not any(code[0] in "RC" for code in status_map_cache[1].values())
+
+
+def update_status_cache(changed_paths=None):
+    """Update the cached git status. Called by watcher when filesystem changes are detected.
+
+    changed_paths are the repo-relative paths reported by the watcher; when
+    given, only those paths are re-checked. None forces a full refresh.
+    """
+    global cached_status, cached_status_hash, status_map_cache, poll_status_sentinel
     helper = get_helper()
     if not helper:
         return
 
-    # -u shows individual files in untracked directories
+    if changed_paths and any(_is_gitignore(p) for p in changed_paths):
+        # Ignore rules changed without touching the index; make /api/poll re-read too
+        poll_status_sentinel = None
+
     try:
-        # Small delay to ensure git has indexed new files (especially on Windows)
-        import time
-        time.sleep(0.1)
-        
-        status_output = (
-            helper.run_command("git status --porcelain -u", strip=False) or ""
-        )
+        status_map = None
+        if _can_refresh_incrementally(changed_paths):
+            status_map = _refresh_status_paths(helper, status_map_cache[1], changed_paths)
+        if status_map is None:
+            status_map = read_git_status(helper)
+        if status_map is None:
+            # git can fail while another process holds index.lock; retry once
+            time.sleep(0.02)
+            status_map = read_git_status(helper) or {}
+        status_output = format_short_status(status_map)
         cached_status = status_output
-        cached_status_hash = hash(status_output)
+        cached_status_hash = fingerprint(status_output)
+        status_map_cache = (time.monotonic(), status_map)
         
         # Also update file list cache when watcher detects changes
-        update_files_cache()
+        if not (changed_paths and len(changed_paths) <= INCREMENTAL_REFRESH_LIMIT
+                and apply_file_changes(changed_paths)):
+            update_files_cache()
     except Exception as e:
         # Only log errors, not every update (reduces I/O overhead)
         print(f"Error in update_status_cache: {e}")
 
 
+def _iter_files(root, ignore_dirs):
+    """Yield paths of non-directory entries under root, relative to root.
+
+    Uses os.scandir so directory checks come from the DirEntry type instead
+    of an extra stat per entry. Directories named in ignore_dirs are skipped.
+    """
+    # Entry paths all start with root plus a separator, so slice it off
+    # rather than normalizing every path with os.path.relpath
+    prefix_len = len(os.path.join(root, ""))
+    stack = [root]
+    while stack:
+        dir_path = stack.pop()
+        try:
+            it = os.scandir(dir_path)
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in ignore_dirs:
+                        stack.append(entry.path)
+                elif entry.is_symlink() and entry.is_dir():
+                    # A symlinked directory is neither a file nor followed
+                    # (as with os.walk); listing it would 404 when opened
+                    continue
+                else:
+                    yield entry.path[prefix_len:]
+
+
 def update_files_cache():
-    """Update the cached file list and its hash."""
-    global cached_files_list, current_repo_path
+    """Rescan the repository and replace the cached file list."""
+    global cached_files_list, cached_files_hash, cached_files_set, files_list_dirty, current_repo_path
     if not current_repo_path:
         return
     
     try:
-        files_list = []
-        ignore_dirs = {".git", "__pycache__", "node_modules", "venv", ".idea", ".vscode"}
-        
-        for root, dirs, files in os.walk(current_repo_path):
-            # Modify dirs in-place to skip ignored directories (more efficient)
-            dirs[:] = [d for d in dirs if d not in ignore_dirs]
-            
-            for file in files:
-                full_path = os.path.join(root, file)
-                rel_path = os.path.relpath(full_path, current_repo_path)
-                files_list.append(rel_path)
-        
-        cached_files_list = sorted(files_list)
+        files_set = set(_iter_files(current_repo_path, FILES_IGNORE_DIRS))
+        files_list = sorted(files_set)
+        files_hash = fingerprint_paths(files_list)
+        with files_cache_lock:
+            cached_files_set = files_set
+            cached_files_list = files_list
+            cached_files_hash = files_hash
+            files_list_dirty = False
     except Exception as e:
         # Only log errors, reduce I/O overhead
         print(f"Error in update_files_cache: {e}")
 
 
+def apply_file_changes(changed_paths):
+    """Patch the cached file set for watcher-reported paths instead of rescanning.
+
+    Returns False if there is no cached set yet and a full scan is needed.
+    The sorted list is rebuilt lazily by get_files_snapshot().
+    """
+    global files_list_dirty
+    if not current_repo_path:
+        return True
+
+    with files_cache_lock:
+        if cached_files_set is None:
+            return False
+
+        for rel_path in changed_paths:
+            rel_path = os.path.normpath(rel_path)
+            if any(part in FILES_IGNORE_DIRS for part in rel_path.split(os.sep)):
+                continue
+            full_path = os.path.join(current_repo_path, rel_path)
+            if os.path.isdir(full_path):
+                if os.path.islink(full_path):
+                    # Symlinked directories aren't listed, matching _iter_files
+                    cached_files_set.discard(rel_path)
+                else:
+                    # New or renamed directory: pick up everything beneath it
+                    cached_files_set.update(
+                        os.path.join(rel_path, p) for p in _iter_files(full_path, FILES_IGNORE_DIRS)
+                    )
+            elif os.path.lexists(full_path):
+                cached_files_set.add(rel_path)
+            else:
+                # Deleted file, or a deleted directory and everything under it
+                cached_files_set.discard(rel_path)
+                prefix = rel_path + os.sep
+                cached_files_set.difference_update(
+                    [p for p in cached_files_set if p.startswith(prefix)]
+                )
+        files_list_dirty = True
+    return True
+
+
+def get_files_snapshot():
+    """Return (sorted file list, fingerprint), re-sorting only after watcher updates."""
+    global cached_files_list, cached_files_hash, files_list_dirty
+    with files_cache_lock:
+        if files_list_dirty and cached_files_set is not None:
+            cached_files_list = sorted(cached_files_set)
+            cached_files_hash = fingerprint_paths(cached_files_list)
+            files_list_dirty = False
+        return cached_files_list, cached_files_hash
+
+
+def detect_primary_language(repo_path):
+    """Return the most common language in repo_path by file extension, or None.
+
+    Results are reused while the repo root's mtime is unchanged, for up to
+    LANGUAGE_CACHE_TTL seconds (deeper edits don't touch the root's mtime).
+    """
+    try:
+        key = (repo_path, os.stat(repo_path).st_mtime_ns)
+    except OSError:
+        return None
+    with language_cache_lock:
+        cached = language_cache.get(key)
+        if cached and time.time() - cached[0] < LANGUAGE_CACHE_TTL:
+            language_cache.move_to_end(key)
+            return cached[1]
+
+    language = _compute_language(repo_path)
+    with language_cache_lock:
+        language_cache[key] = (time.time(), language)
+        language_cache.move_to_end(key)
+        while len(language_cache) > LANGUAGE_CACHE_SIZE:
+            language_cache.popitem(last=False)
+    return language
+
+
+def _file_ext(name):
+    """Return a bare file name's lowercase extension ('.py'), or '' if it has none.
+
+    Matches os.path.splitext for file names (dotfiles have no extension)
+    but only slices the short suffix instead of parsing a path.
+    """
+    dot = name.rfind('.')
+    return name[dot:].lower() if dot > 0 else ""
+
+
+def _compute_language(repo_path):
+    """Return repo_path's most common language by file extension.
+
+    Reads the tracked file list from the git index; walks the directory
+    tree only when repo_path isn't a usable git repository.
+    """
+    tracked = GitHelper(repo_path).run_command(["git", "ls-files", "-z"], strip=False)
+    if tracked is not None:
+        names = (path.rpartition("/")[2] for path in tracked.split("\0"))
+    else:
+        names = _iter_file_names(repo_path)
+
+    file_counts = collections.Counter(
+        language for language in map(LANG_BY_EXT.get, map(_file_ext, names)) if language
+    )
+    if file_counts:
+        return file_counts.most_common(1)[0][0]
+    return None
+
+
+def _iter_file_names(root):
+    """Yield the names of files under root, skipping hidden directories."""
+    stack = [root]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    # Skip .git and other hidden directories
+                    if not entry.name.startswith('.'):
+                        stack.append(entry.path)
+                elif not (entry.is_symlink() and entry.is_dir()):
+                    yield entry.name
+
+
+def _status_sentinel():
+    """Return the (index, HEAD) mtimes of the current repo, or None if unavailable."""
+    git_dir = os.path.join(current_repo_path, ".git")
+    try:
+        return (
+            os.stat(os.path.join(git_dir, "index")).st_mtime_ns,
+            os.stat(os.path.join(git_dir, "HEAD")).st_mtime_ns,
+        )
+    except (OSError, TypeError):
+        return None
+
+
 @app.route("/api/set-repo", methods=["POST"])
 def set_repo():
-    global current_repo_path, git_helper, repo_watcher, last_status_hash, last_files_hash, cached_files_list
+    global current_repo_path, current_repo_prefix, git_helper, repo_watcher, last_status_hash, last_files_hash, cached_files_list, cached_files_hash, cached_files_set, status_map_cache, poll_status_sentinel
     data = request.json
     path = data.get("path")
 
@@ -205,10 +925,20 @@ def set_repo():
         return jsonify({"error": "Invalid path"}), 400
 
     current_repo_path = path
+    current_repo_prefix = os.path.join(os.path.realpath(path), "")
+    if git_helper:
+        git_helper.close()  # Stop the old repo's cat-file process
     git_helper = None  # Reset helper
     last_status_hash = None  # Reset hash tracking for new repo
     last_files_hash = None  # Reset file list hash tracking
-    cached_files_list = None  # Reset cached file list
+    with files_cache_lock:
+        cached_files_list = None  # Reset cached file list
+        cached_files_hash = None
+        cached_files_set = None
+    status_map_cache = None  # Reset parsed status
+    poll_status_sentinel = None
+    with analysis_lock:
+        analysis_cache.clear()  # Analyses describe the previous repo's changes
 
     # Start watcher
     if repo_watcher:
@@ -232,7 +962,7 @@ def get_status():
 
     # We use run_command directly to get the raw output
     # -u shows individual files in untracked directories
-    status_output = helper.run_command("git status -s -u")
+    status_output = helper.run_command(["git", "status", "-s", "-u"])
     if status_output is None:
         return jsonify({"status": "Error getting status"}), 500
 
@@ -241,7 +971,7 @@ def get_status():
 
 @app.route("/api/poll", methods=["POST"])
 def poll_changes():
-    global last_status_hash, cached_status, cached_status_hash, last_files_hash, cached_files_list
+    global last_status_hash, cached_status, cached_status_hash, last_files_hash, cached_files_list, status_map_cache, poll_status_sentinel
     helper = get_helper()
     if not helper:
         return jsonify({"error": "Repository not set"}), 400
@@ -263,46 +993,83 @@ def poll_changes():
         # Watcher callback already updated the cache, use it for instant updates
         status_output = cached_status.rstrip() if cached_status else ""
     else:
-        # Fetch fresh status (normal polling case)
-        raw_status = helper.run_command("git status --porcelain -u", strip=False)
-        if raw_status is None:
-            raw_status = ""
-        status_output = raw_status.rstrip() if raw_status else ""
-        
-        # Update cache if stale
-        if cached_status is None:
-            cached_status = status_output
-            cached_status_hash = hash(status_output)
-    
-    current_hash = hash(status_output)
+        # With a live watcher, worktree edits arrive as events; if the index and
+        # HEAD are also untouched since our last read, git status can be skipped
+        # (bounded by POLL_SENTINEL_MAX_AGE in case an event was missed)
+        sentinel = _status_sentinel() if (repo_watcher and repo_watcher.is_watching()) else None
+        now = time.monotonic()
+        if (sentinel is not None and poll_status_sentinel is not None
+                and sentinel == poll_status_sentinel[0]
+                and now - poll_status_sentinel[1] < POLL_SENTINEL_MAX_AGE
+                and cached_status is not None):
+            status_output = cached_status.rstrip()
+        else:
+            # Fetch fresh status (normal polling case)
+            status_map = read_git_status(helper) or {}
+            status_map_cache = (now, status_map)
+            status_output = format_short_status(status_map)
+            poll_status_sentinel = (sentinel, now) if sentinel is not None else None
 
-    # Change detection - compare against last known hash
-    status_hash_changed = (last_status_hash is None) or (current_hash != last_status_hash)
-    # If watcher triggered, always mark as changed to ensure UI updates immediately
-    has_changed = watcher_triggered or status_hash_changed
+            # Keep the cache in step with what we just read
+            cached_status = status_output
+            cached_status_hash = fingerprint(status_output)
     
-    # Always update hash for next comparison (important for tracking changes)
-    last_status_hash = current_hash
+    current_hash = fingerprint(status_output)
 
     # Check for file list changes (files added/removed)
     files_changed = False
-    if watcher_triggered or cached_files_list is None:
+    # The watcher callback already patched the file list for reported changes
+    files_list, current_files_hash = get_files_snapshot()
+    if files_list is None:
         update_files_cache()
-    
-    if cached_files_list is not None:
-        current_files_hash = hash(tuple(cached_files_list))
-        files_changed = (last_files_hash is None) or (current_files_hash != last_files_hash)
-        if files_changed:
-            last_files_hash = current_files_hash
+        files_list, current_files_hash = get_files_snapshot()
+
+    # Compare-and-update under one lock so concurrent polls can't both
+    # report (and analyze) the same change
+    with poll_state_lock:
+        # Change detection - compare against last known hash
+        status_hash_changed = (last_status_hash is None) or (current_hash != last_status_hash)
+        # If watcher triggered, always mark as changed to ensure UI updates immediately
+        has_changed = watcher_triggered or status_hash_changed
+
+        # Always update hash for next comparison (important for tracking changes)
+        last_status_hash = current_hash
+
+        if files_list is not None:
+            files_changed = (last_files_hash is None) or (current_files_hash != last_files_hash)
+            if files_changed:
+                last_files_hash = current_files_hash
 
     summary = None
     dsl_suggestion = None
+    analysis_pending = False
 
-    # Trigger if changed OR forced, AND there is status output
-    should_analyze = (has_changed or force_analysis) and status_output.strip()
+    if status_output.strip():
+        if force_analysis:
+            # The user asked for it explicitly, so wait for the result
+            summary, dsl_suggestion = analyze_status(status_output, current_hash, force=True)
+        else:
+            # Start an analysis on change, but answer with the status right away;
+            # later polls pick the result up from the cache
+            result, analysis_pending = peek_analysis(status_output, current_hash, start=has_changed)
+            if result:
+                summary, dsl_suggestion = result
 
-    if should_analyze:
-        prompt = f"""
+    return jsonify(
+        {
+            "has_changed": has_changed,
+            "files_changed": files_changed,
+            "status": status_output,
+            "summary": summary,
+            "dsl_suggestion": dsl_suggestion,
+            "analysis_pending": analysis_pending,
+        }
+    )
+
+
+def _request_status_analysis(status_output):
+    """Ask Gemini for a summary and commit DSL. Returns (summary, dsl, ok)."""
+    prompt = f"""
 You are a Git Assistant. Here is the current `git status -s` output of a repository:
 
 {status_output}
@@ -320,32 +1087,91 @@ You are a Git Assistant. Here is the current `git status -s` output of a reposit
 Return JSON with keys "summary" and "dsl".
 """
 
-        try:
-            text = send_gemini_prompt(
-                prompt,
-                response_mime_type="application/json",
-                temperature=0.3,
-            )
-            try:
-                parsed = json.loads(text)
-                summary = parsed.get("summary")
-                dsl_suggestion = parsed.get("dsl")
-            except json.JSONDecodeError:
-                summary = "Could not parse Gemini response."
-                dsl_suggestion = None
-        except RuntimeError as exc:
-            summary = str(exc)
-            dsl_suggestion = None
+    try:
+        text = send_gemini_prompt(
+            prompt,
+            response_mime_type="application/json",
+            temperature=0.3,
+        )
+    except RuntimeError as exc:
+        return str(exc), None, False
 
-    return jsonify(
-        {
-            "has_changed": has_changed,
-            "files_changed": files_changed,
-            "status": status_output,
-            "summary": summary,
-            "dsl_suggestion": dsl_suggestion,
-        }
-    )
+    parsed = extract_json_object(text)
+    if parsed is None:
+        return "Could not parse Gemini response.", None, False
+    return parsed.get("summary"), parsed.get("dsl"), True
+
+
+def analyze_status(status_output, status_hash, force=False):
+    """Return (summary, dsl) for a status, coalescing concurrent and repeated requests.
+
+    Results are cached per status hash; pollers that arrive while an analysis
+    for the same status is running wait for it instead of calling Gemini again.
+    `force` skips the cache but still joins an in-flight request.
+    """
+    with analysis_lock:
+        if not force and status_hash in analysis_cache:
+            analysis_cache.move_to_end(status_hash)
+            return analysis_cache[status_hash]
+        future = analysis_inflight.get(status_hash)
+        owner = future is None
+        if owner:
+            future = Future()
+            analysis_inflight[status_hash] = future
+
+    if not owner:
+        return future.result()
+
+    result = ("Could not analyze changes.", None)
+    try:
+        # Short quiet window so pollers hitting the same burst share this call
+        time.sleep(ANALYSIS_QUIET_WINDOW)
+        summary, dsl, ok = _request_status_analysis(status_output)
+        result = (summary, dsl)
+        if ok:
+            with analysis_lock:
+                analysis_cache[status_hash] = result
+                analysis_cache.move_to_end(status_hash)
+                while len(analysis_cache) > ANALYSIS_CACHE_SIZE:
+                    analysis_cache.popitem(last=False)
+    finally:
+        with analysis_lock:
+            analysis_inflight.pop(status_hash, None)
+        future.set_result(result)
+    return result
+
+
+def peek_analysis(status_output, status_hash, start=True):
+    """Return (cached (summary, dsl) or None, pending) without waiting on Gemini.
+
+    When nothing is cached or running for this status and `start` is set, the
+    analysis is started on ANALYSIS_POOL.
+    """
+    with analysis_lock:
+        if status_hash in analysis_cache:
+            analysis_cache.move_to_end(status_hash)
+            return analysis_cache[status_hash], False
+        if status_hash in analysis_inflight:
+            return None, True
+    if not start:
+        return None, False
+    ANALYSIS_POOL.submit(analyze_status, status_output, status_hash)
+    return None, True
+
+
+def get_recent_log(helper):
+    """Return `git log --oneline -n 10`, reusing the last result while HEAD is unchanged."""
+    head = helper.run_command(["git", "rev-parse", "HEAD"])
+    with recent_log_lock:
+        if head and recent_log_cache["head"] == head:
+            return recent_log_cache["value"]
+
+    log_output = helper.run_command(["git", "log", "--oneline", "-n", "10"])
+    if head and log_output is not None:
+        with recent_log_lock:
+            recent_log_cache["head"] = head
+            recent_log_cache["value"] = log_output
+    return log_output
 
 
 @app.route("/api/chat", methods=["POST"])
@@ -360,8 +1186,8 @@ def chat():
     if not user_message:
         return jsonify({"error": "No message provided"}), 400
 
-    status_output = helper.run_command("git status -s -u") or "No changes."
-    log_output = helper.run_command("git log --oneline -n 10") or "No recent commits."
+    status_output = helper.run_command(["git", "status", "-s", "-u"]) or "No changes."
+    log_output = get_recent_log(helper) or "No recent commits."
 
     try:
         prompt = f"""
@@ -399,22 +1225,34 @@ Return JSON:
             response_mime_type="application/json",
             temperature=0.4,
         )
-        try:
-            parsed = json.loads(text)
-            return jsonify(
-                {
-                    "response": parsed.get("response", "No response received."),
-                    "dsl": parsed.get("dsl"),
-                }
-            )
-        except json.JSONDecodeError:
+        parsed = extract_json_object(text)
+        if parsed is None:
             return jsonify({"response": text, "dsl": None})
+        return jsonify(
+            {
+                "response": parsed.get("response", "No response received."),
+                "dsl": parsed.get("dsl"),
+            }
+        )
     except RuntimeError as e:
         return jsonify({"error": str(e)}), 500
 
 
+def _record_dsl_job(job_id, future):
+    """Store the outcome of a finished DSL job."""
+    try:
+        job = {"state": "done", "output": future.result()}
+    except Exception as e:
+        job = {"state": "error", "error": f"DSL execution failed: {str(e)}"}
+
+    with dsl_jobs_lock:
+        if job_id in dsl_jobs:
+            dsl_jobs[job_id] = job
+
+
 @app.route("/api/execute", methods=["POST"])
 def execute_dsl():
+    """Start a DSL script in the background and return a job id to poll."""
     helper = get_helper()
     if not helper:
         return jsonify({"error": "Repository not set"}), 400
@@ -425,56 +1263,91 @@ def execute_dsl():
     if not dsl_code:
         return jsonify({"error": "No DSL code provided"}), 400
 
-    temp_file = None
-    try:
-        with NamedTemporaryFile(mode="w", suffix=".dsl", delete=False) as tmp:
-            tmp.write(dsl_code)
-            temp_file = tmp.name
+    job_id = uuid.uuid4().hex
+    with dsl_jobs_lock:
+        dsl_jobs[job_id] = {"state": "running"}
+        while len(dsl_jobs) > MAX_DSL_JOBS:
+            dsl_jobs.popitem(last=False)
 
-        executor = DSLExecutor(helper)
+    # Scripts run on pool threads so long deploys don't hold a request thread;
+    # run_dsl_job captures each job's printed output separately
+    future = DSL_POOL.submit(run_dsl_job, dsl_code, current_repo_path)
+    future.add_done_callback(lambda f: _record_dsl_job(job_id, f))
 
-        import io
-        from contextlib import redirect_stdout
+    return jsonify({"message": "Execution started", "job_id": job_id}), 202
 
-        buffer = io.StringIO()
-        with redirect_stdout(buffer):
-            executor.execute_script(temp_file)
 
-        output = buffer.getvalue()
-        return jsonify({"output": output})
-    finally:
-        if temp_file and os.path.exists(temp_file):
-            os.remove(temp_file)
+@app.route("/api/execute/status/<job_id>", methods=["GET"])
+def execute_status(job_id):
+    """Get the state of a DSL job; finished jobs are discarded once read."""
+    with dsl_jobs_lock:
+        job = dsl_jobs.get(job_id)
+        if job and job["state"] != "running":
+            del dsl_jobs[job_id]
+
+    if not job:
+        return jsonify({"error": "Execution job not found"}), 404
+    return jsonify(job)
+
+
+def _get_commit_count(helper):
+    """Return `git rev-list --count HEAD`, cached per HEAD sha.
+
+    Counting walks the whole history, but the result only changes when HEAD moves.
+    """
+    rev_output = helper.run_command(["git", "rev-parse", "--absolute-git-dir", "HEAD"])
+    if not rev_output:
+        return None
+    git_dir, _, head = rev_output.partition("\n")
 
+    cached = commit_count_cache.get(git_dir)
+    if cached and cached[0] == head:
+        return cached[1]
 
+    total_count = helper.run_command(["git", "rev-list", "--count", "HEAD"])
+    if total_count is None:
+        return None
+    commit_count_cache[git_dir] = (head, total_count)
+    return total_count
+
+
+def _get_ahead_behind(helper):
+    """Return (ahead, behind) relative to the upstream branch, or None if there is none.
+
+    rev-list only walks commits; `git status -sb` would also scan the working tree.
+    """
+    counts = helper.run_command(["git", "rev-list", "--left-right", "--count", "HEAD...@{upstream}"])
+    if not counts:
+        return None
+    try:
+        ahead, behind = counts.split()
+        return int(ahead), int(behind)
+    except ValueError:
+        return None
 
-def _get_commit_stats(helper):
-    """Helper to get commit statistics."""
-    total_count = helper.run_command("git rev-list --count HEAD")
+
+def _get_commit_stats(helper, pending_fetch=None):
+    """Helper to get commit statistics.
+
+    pending_fetch is an in-flight `git fetch` Future; the local commit count
+    is computed while it runs and ahead/behind once it has finished.
+    """
+    total_count = _get_commit_count(helper)
     if total_count is None:
         return {"total": 0, "unpushed": 0, "behind": 0}
 
-    # Use git status -sb to get ahead/behind info
-    status_sb = helper.run_command("git status -sb")
     unpushed_count = 0
     behind_count = 0
 
-    if status_sb:
-        first_line = status_sb.splitlines()[0]
-        if "..." not in first_line:
-            # No upstream, so all commits are unpushed
-            unpushed_count = total_count
-        else:
-            # Has upstream, check for [ahead N] and [behind N]
-            import re
-
-            match_ahead = re.search(r"ahead (\d+)", first_line)
-            if match_ahead:
-                unpushed_count = int(match_ahead.group(1))
-
-            match_behind = re.search(r"behind (\d+)", first_line)
-            if match_behind:
-                behind_count = int(match_behind.group(1))
+    if pending_fetch is not None:
+        # Ahead/behind needs the refreshed remote-tracking refs
+        pending_fetch.result()
+    ahead_behind = _get_ahead_behind(helper)
+    if ahead_behind is None:
+        # No upstream, so all commits are unpushed
+        unpushed_count = total_count
+    else:
+        unpushed_count, behind_count = ahead_behind
     
     try:
         return {
@@ -486,6 +1359,13 @@ def _get_commit_stats(helper):
         return {"total": 0, "unpushed": 0, "behind": 0}
 
 
+def _get_commit_stats_after_fetch(helper):
+    """Run git fetch and return commit stats, overlapping the fetch with local work."""
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        fetch = executor.submit(helper.run_command, ["git", "fetch"])
+        return _get_commit_stats(helper, pending_fetch=fetch)
+
+
 @app.route("/api/commits", methods=["GET"])
 def get_commit_count():
     helper = get_helper()
@@ -508,8 +1388,8 @@ def manual_commit():
     if not message:
         return jsonify({"error": "Commit message required"}), 400
 
-    helper.run_command("git add .")
-    output = helper.run_command(f'git commit -m "{message}"')
+    helper.run_command(["git", "add", "."])
+    output = helper.run_command(["git", "commit", "-m", message])
 
     if output is None:
         return jsonify({"error": "Commit failed"}), 500
@@ -533,8 +1413,7 @@ def push_changes():
         
         if helper.publish_branch(info["branch"]):
              # Fetch latest stats
-             helper.run_command("git fetch")
-             stats = _get_commit_stats(helper)
+             stats = _get_commit_stats_after_fetch(helper)
              return jsonify({"message": "Branch published successfully", "stats": stats})
         else:
              return jsonify({"error": "Failed to publish branch"}), 500
@@ -542,8 +1421,7 @@ def push_changes():
         try:
             if helper.push_changes():
                 # Ensure we have latest info
-                helper.run_command("git fetch")
-                stats = _get_commit_stats(helper)
+                stats = _get_commit_stats_after_fetch(helper)
                 return jsonify({"message": "Push successful", "stats": stats})
             else:
                 return jsonify({"error": "Failed to push changes to remote"}), 500
@@ -557,7 +1435,7 @@ def manual_pull():
     if not helper:
         return jsonify({"error": "Repository not set"}), 400
 
-    output = helper.run_command("git pull")
+    output = helper.run_command(["git", "pull"])
 
     if output is None:
         return jsonify({"error": "Pull failed"}), 500
@@ -585,48 +1463,46 @@ def list_branches():
     if not helper:
         return jsonify({"error": "Repository not set"}), 400
 
-    # Get local branches (more compatible command)
-    local_branches = helper.run_command("git branch", strip=False)
-    # Get remote branches
-    remote_branches = helper.run_command("git branch -r", strip=False)
-    # Get current branch
-    current = helper.run_command("git branch --show-current")
+    # One for-each-ref lists local and remote branches plus the HEAD marker
+    refs_output = helper.run_command(
+        ["git", "for-each-ref", "--format=%(HEAD)%00%(refname)", "refs/heads", "refs/remotes"],
+        strip=False,
+    )
 
+    current = ""
     local_list = []
     remote_list = []
 
-    if local_branches:
-        # Parse local branches, removing * marker and whitespace
-        for line in local_branches.split('\n'):
-            line = line.strip()
-            if not line:
-                continue
-            # Remove * marker if present
-            branch_name = line.replace('*', '').strip()
-            if branch_name:
-                local_list.append(branch_name)
-        
-        # Ensure current branch is first in list
-        if current and current.strip() in local_list:
-            local_list.remove(current.strip())
-            local_list.insert(0, current.strip())
-
-    if remote_branches:
-        # Parse remote branches, filter out HEAD and extract branch names
-        for line in remote_branches.split('\n'):
-            line = line.strip()
-            if not line or 'HEAD' in line:
-                continue
-            # Extract branch name from "origin/branch-name" format
-            if '/' in line:
-                branch_name = line.split('/')[-1].strip()
-                if branch_name and branch_name not in local_list:
-                    remote_list.append(branch_name)
+    for line in (refs_output or "").splitlines():
+        head_marker, _, refname = line.partition("\0")
+        if refname.startswith("refs/heads/"):
+            branch_name = refname[len("refs/heads/"):]
+            if head_marker == "*":
+                current = branch_name
+            local_list.append(branch_name)
+        elif refname.startswith("refs/remotes/"):
+            # refs/remotes/<remote>/<branch>; skip the symbolic <remote>/HEAD
+            branch_name = refname[len("refs/remotes/"):].partition("/")[2]
+            if branch_name and branch_name != "HEAD":
+                remote_list.append(branch_name)
+
+    if not current:
+        # An unborn branch (no commits yet) has no ref to carry the HEAD marker,
+        # but HEAD still names it; a detached HEAD leaves current empty
+        current = helper.run_command(["git", "symbolic-ref", "--quiet", "--short", "HEAD"]) or ""
+
+    # Ensure current branch is first in list
+    if current in local_list:
+        local_list.remove(current)
+        local_list.insert(0, current)
+
+    local_set = set(local_list)
+    remote_list = [b for b in dict.fromkeys(remote_list) if b not in local_set]
 
     return jsonify({
         "local": local_list,
         "remote": remote_list,
-        "current": helper.run_command("git branch --show-current") or ""
+        "current": current
     })
 
 
@@ -644,7 +1520,7 @@ def switch_branch():
         return jsonify({"error": "Branch name required"}), 400
 
     # Check if branch exists locally (more compatible command)
-    branches = helper.run_command("git branch", strip=False)
+    branches = helper.run_command(["git", "branch"], strip=False)
     branch_exists = False
     if branches:
         for line in branches.split('\n'):
@@ -655,11 +1531,11 @@ def switch_branch():
 
     if branch_exists:
         # Switch to existing local branch
-        output = helper.run_command(f'git checkout "{branch_name}"')
+        output = helper.run_command(["git", "checkout", branch_name])
     else:
         # Try to checkout remote branch (creates local tracking branch)
         # First check if it exists remotely
-        remote_branches = helper.run_command("git branch -r", strip=False)
+        remote_branches = helper.run_command(["git", "branch", "-r"], strip=False)
         remote_exists = False
         if remote_branches:
             for line in remote_branches.split('\n'):
@@ -669,7 +1545,7 @@ def switch_branch():
                     break
         
         if remote_exists:
-            output = helper.run_command(f'git checkout -b "{branch_name}" "origin/{branch_name}"')
+            output = helper.run_command(["git", "checkout", "-b", branch_name, f"origin/{branch_name}"])
         else:
             return jsonify({"error": f"Branch '{branch_name}' not found"}), 404
 
@@ -677,7 +1553,7 @@ def switch_branch():
         return jsonify({"error": f"Failed to switch to branch '{branch_name}'"}), 500
 
     # Get new current branch
-    new_branch = helper.run_command("git branch --show-current")
+    new_branch = helper.run_command(["git", "branch", "--show-current"])
     
     return jsonify({
         "output": output,
@@ -700,7 +1576,7 @@ def create_branch():
         return jsonify({"error": "Branch name required"}), 400
 
     # Check if branch already exists
-    branches = helper.run_command("git branch", strip=False)
+    branches = helper.run_command(["git", "branch"], strip=False)
     if branches:
         for line in branches.split('\n'):
             line = line.replace('*', '').strip()
@@ -710,16 +1586,16 @@ def create_branch():
     # Create new branch
     if switch:
         # Create and switch to new branch
-        output = helper.run_command(f'git checkout -b "{branch_name}"')
+        output = helper.run_command(["git", "checkout", "-b", branch_name])
     else:
         # Just create the branch without switching
-        output = helper.run_command(f'git branch "{branch_name}"')
+        output = helper.run_command(["git", "branch", branch_name])
 
     if output is None:
         return jsonify({"error": f"Failed to create branch '{branch_name}'"}), 500
 
     # Get current branch (will be new branch if switch=True)
-    current = helper.run_command("git branch --show-current")
+    current = helper.run_command(["git", "branch", "--show-current"])
     
     return jsonify({
         "output": output,
@@ -741,7 +1617,7 @@ def stage_file():
     if not file_path:
         return jsonify({"error": "File path required"}), 400
 
-    output = helper.run_command(f'git add "{file_path}"')
+    output = helper.run_command(["git", "add", "--", file_path])
     
     if output is None:
         return jsonify({"error": f"Failed to stage file '{file_path}'"}), 500
@@ -762,7 +1638,7 @@ def unstage_file():
     if not file_path:
         return jsonify({"error": "File path required"}), 400
 
-    output = helper.run_command(f'git reset HEAD -- "{file_path}"')
+    output = helper.run_command(["git", "reset", "HEAD", "--", file_path])
     
     if output is None:
         return jsonify({"error": f"Failed to unstage file '{file_path}'"}), 500
@@ -786,105 +1662,78 @@ def revert_all_files():
     import os
     global current_repo_path
     
-    # Get git status to categorize files
-    status_output = helper.run_command("git status --porcelain -u", strip=False)
+    # Get git status for just these files to categorize them
+    status_map = read_git_status(helper, file_paths)
     
     untracked_files = []
     new_files = []
     modified_files = []
     
-    if status_output:
-        status_lines = status_output.split('\n')
+    if status_map:
         for file_path in file_paths:
-            found = False
-            for line in status_lines:
-                line = line.strip()
-                if not line:
-                    continue
-                
-                line_path = line[3:] if len(line) > 3 else ""
-                if line_path.startswith('"') and line_path.endswith('"'):
-                    line_path = line_path[1:-1]
-                
-                # Normalize paths
-                normalized_line_path = line_path.replace('\\', '/')
-                normalized_file_path = file_path.replace('\\', '/')
-                
-                if (normalized_line_path == normalized_file_path or 
-                    line_path == file_path or 
-                    line.endswith(file_path)):
-                    status_code = line[:2]
-                    if status_code == '??':
-                        untracked_files.append(file_path)
-                    elif status_code[0] == 'A' or (status_code[0] == ' ' and status_code[1] == 'A'):
-                        new_files.append(file_path)
-                    else:
-                        modified_files.append(file_path)
-                    found = True
-                    break
-            
-            if not found:
-                # File not in status, assume it's modified
+            status_code = status_map.get(file_path.replace('\\', '/'))
+            # Files not in status are assumed to be modified
+            file_status = classify_status(status_code) if status_code else 'modified'
+            if file_status == 'untracked':
+                untracked_files.append(file_path)
+            elif file_status == 'new':
+                new_files.append(file_path)
+            else:
                 modified_files.append(file_path)
     
     results = {"succeeded": [], "failed": []}
     
+    def remove_file(file_path):
+        full_path = os.path.join(current_repo_path, file_path) if current_repo_path else None
+        if full_path and os.path.exists(full_path):
+            try:
+                os.remove(full_path)
+                results["succeeded"].append(file_path)
+            except Exception as e:
+                results["failed"].append({"file": file_path, "error": str(e)})
+        else:
+            results["failed"].append({"file": file_path, "error": "File not found"})
+
     try:
-        # First, unstage all files that need unstaging
+        # Unstage everything in one reset instead of one per file
         if modified_files or new_files:
-            all_to_unstage = modified_files + new_files
-            # Unstage all at once
-            for file_path in all_to_unstage:
-                helper.run_command(f'git reset HEAD -- "{file_path}"')
-        
-        # Remove untracked files
-        for file_path in untracked_files:
-            full_path = os.path.join(current_repo_path, file_path) if current_repo_path else None
-            if full_path and os.path.exists(full_path):
-                try:
-                    os.remove(full_path)
-                    results["succeeded"].append(file_path)
-                except Exception as e:
-                    results["failed"].append({"file": file_path, "error": str(e)})
-            else:
-                results["failed"].append({"file": file_path, "error": "File not found"})
+            run_git_with_paths(helper, ["git", "reset", "-q", "HEAD", "--"], modified_files + new_files)
         
-        # Remove new files
-        for file_path in new_files:
-            full_path = os.path.join(current_repo_path, file_path) if current_repo_path else None
-            if full_path and os.path.exists(full_path):
-                try:
-                    os.remove(full_path)
-                    results["succeeded"].append(file_path)
-                except Exception as e:
-                    results["failed"].append({"file": file_path, "error": str(e)})
-            else:
-                results["failed"].append({"file": file_path, "error": "File not found"})
+        # Remove untracked and new files
+        for file_path in untracked_files + new_files:
+            remove_file(file_path)
         
-        # Restore modified files from HEAD - do this sequentially to avoid index locking
+        # Split modified files into those present in HEAD (restore) and not (remove)
+        in_head = set()
+        if modified_files:
+            ls_output = run_git_with_paths(
+                helper, ["git", "ls-tree", "-z", "--name-only", "HEAD", "--"], modified_files
+            )
+            in_head = set(filter(None, (ls_output or "").split("\0")))
+        to_restore = []
         for file_path in modified_files:
-            try:
-                # Check if file exists in HEAD
-                check_output = helper.run_command(f'git ls-tree HEAD -- "{file_path}"')
-                if check_output is None:
-                    # File doesn't exist in HEAD, remove it
-                    full_path = os.path.join(current_repo_path, file_path) if current_repo_path else None
-                    if full_path and os.path.exists(full_path):
-                        os.remove(full_path)
-                        results["succeeded"].append(file_path)
-                    else:
-                        results["failed"].append({"file": file_path, "error": "File not found"})
+            if file_path.replace('\\', '/') in in_head:
+                to_restore.append(file_path)
+            else:
+                remove_file(file_path)
+
+        if to_restore:
+            checkout_ok = run_git_with_paths(helper, ["git", "checkout", "HEAD", "--"], to_restore) is not None
+            if not checkout_ok:
+                # Batch failed (e.g. a locked file); retry per file to find which ones
+                for file_path in to_restore:
+                    helper.run_command(["git", "checkout", "HEAD", "--", file_path])
+
+            # One diff to confirm which files now match HEAD
+            diff_output = run_git_with_paths(
+                helper, ["git", "diff", "--name-only", "-z", "HEAD", "--"], to_restore
+            )
+            still_different = set(filter(None, (diff_output or "").split("\0")))
+            for file_path in to_restore:
+                if file_path.replace('\\', '/') in still_different:
+                    results["failed"].append({"file": file_path, "error": "File still has differences after restore"})
                 else:
-                    # File exists in HEAD, restore it
-                    output = helper.run_command(f'git checkout HEAD -- "{file_path}"')
-                    # Check if restore was successful
-                    diff_output = helper.run_command(f'git diff HEAD -- "{file_path}"')
-                    if diff_output and diff_output.strip():
-                        results["failed"].append({"file": file_path, "error": "File still has differences after restore"})
-                    else:
-                        results["succeeded"].append(file_path)
-            except Exception as e:
-                results["failed"].append({"file": file_path, "error": str(e)})
+                    results["succeeded"].append(file_path)
         
         return jsonify({
             "message": f"Reverted {len(results['succeeded'])} file(s)",
@@ -912,45 +1761,12 @@ def revert_file():
     global current_repo_path
     full_path = os.path.join(current_repo_path, file_path) if current_repo_path else None
 
-    # Get git status for this specific file to determine its state
-    status_output = helper.run_command("git status --porcelain -u", strip=False)
-    file_status = None
-    is_untracked = False
-    is_new_file = False
-    
-    if status_output:
-        for line in status_output.split('\n'):
-            line = line.strip()
-            if not line:
-                continue
-            # Check if this line refers to our file
-            # Handle quoted paths (git status quotes paths with spaces)
-            line_path = line[3:] if len(line) > 3 else ""
-            if line_path.startswith('"') and line_path.endswith('"'):
-                line_path = line_path[1:-1]
-            
-            # Normalize paths for comparison (handle Windows/Unix path separators)
-            normalized_line_path = line_path.replace('\\', '/')
-            normalized_file_path = file_path.replace('\\', '/')
-            
-            # Match exact file path (more robust matching)
-            if (normalized_line_path == normalized_file_path or 
-                line_path == file_path or 
-                line.endswith(file_path) or
-                normalized_line_path.endswith(normalized_file_path)):
-                status_code = line[:2]
-                # ?? = untracked
-                if status_code == '??':
-                    is_untracked = True
-                    file_status = 'untracked'
-                # A  = new file, staged
-                # A? = new file, unstaged (shouldn't happen, but handle it)
-                elif status_code[0] == 'A' or (status_code[0] == ' ' and status_code[1] == 'A'):
-                    is_new_file = True
-                    file_status = 'new'
-                else:
-                    file_status = 'modified'
-                break
+    # Ask git for this file's status only, rather than the whole tree
+    status_map = read_git_status(helper, [file_path]) or {}
+    status_code = next(iter(status_map.values()), None)
+    file_status = classify_status(status_code) if status_code else None
+    is_untracked = file_status == 'untracked'
+    is_new_file = file_status == 'new'
 
     try:
         if is_untracked:
@@ -963,7 +1779,7 @@ def revert_file():
         elif is_new_file:
             # For new files (staged or unstaged), unstage first then remove
             # Unstage if staged
-            helper.run_command(f'git reset HEAD -- "{file_path}"')
+            helper.run_command(["git", "reset", "HEAD", "--", file_path])
             # Remove the file
             if full_path and os.path.exists(full_path):
                 os.remove(full_path)
@@ -971,40 +1787,29 @@ def revert_file():
             else:
                 return jsonify({"error": f"File '{file_path}' not found"}), 404
         else:
-            # For tracked files with modifications, restore from HEAD
-            # First unstage if it's staged
-            helper.run_command(f'git reset HEAD -- "{file_path}"')
-            
-            # Check if file exists in HEAD before trying to restore
-            check_output = helper.run_command(f'git ls-tree HEAD -- "{file_path}"')
-            if check_output is None:
-                # File doesn't exist in HEAD, so it's a new file - remove it
-                if full_path and os.path.exists(full_path):
-                    try:
-                        os.remove(full_path)
-                        return jsonify({"message": f"Removed new file '{file_path}'"})
-                    except Exception as e:
-                        return jsonify({"error": f"Failed to remove file: {str(e)}"}), 500
-                else:
-                    return jsonify({"error": f"File '{file_path}' not found"}), 404
-            
-            # File exists in HEAD, restore it
-            output = helper.run_command(f'git checkout HEAD -- "{file_path}"')
-            
-            # git checkout can succeed but return empty output
-            # Check if the command actually failed by verifying the file was restored
-            if output is None:
-                # Command might have failed, but let's check if file was actually restored
-                # by comparing with HEAD version
-                diff_output = helper.run_command(f'git diff HEAD -- "{file_path}"')
-                if diff_output and diff_output.strip():
-                    # Still has differences, revert might have failed
-                    return jsonify({"error": f"Failed to revert file '{file_path}'. File may have conflicts or be locked."}), 500
-
-            return jsonify({
-                "message": f"Reverted '{file_path}' to HEAD version",
-                "output": output or ""
-            })
+            # For tracked files, checkout from HEAD restores both the index
+            # entry and the working copy, so no separate unstage is needed
+            output = helper.run_command(["git", "checkout", "HEAD", "--", file_path])
+            if output is not None:
+                return jsonify({
+                    "message": f"Reverted '{file_path}' to HEAD version",
+                    "output": output
+                })
+
+            # Checkout failed; if the file isn't in HEAD it's effectively new, so remove it
+            check_output = helper.run_command(["git", "ls-tree", "HEAD", "--", file_path])
+            if check_output:
+                return jsonify({"error": f"Failed to revert file '{file_path}'. File may have conflicts or be locked."}), 500
+
+            helper.run_command(["git", "reset", "HEAD", "--", file_path])
+            if full_path and os.path.exists(full_path):
+                try:
+                    os.remove(full_path)
+                    return jsonify({"message": f"Removed new file '{file_path}'"})
+                except Exception as e:
+                    return jsonify({"error": f"Failed to remove file: {str(e)}"}), 500
+            else:
+                return jsonify({"error": f"File '{file_path}' not found"}), 404
     except Exception as e:
         return jsonify({"error": f"Failed to revert file: {str(e)}"}), 500
 
@@ -1131,7 +1936,7 @@ def list_repositories():
     potential_dirs = []
     
     # Add configured GitHub path first if it exists
-    if configured_github_path and os.path.exists(configured_github_path) and os.path.isdir(configured_github_path):
+    if configured_github_path and _is_dir(configured_github_path):
         potential_dirs.append(configured_github_path)
         print(f"Scanning configured GitHub path: {configured_github_path}")
     
@@ -1144,9 +1949,9 @@ def list_repositories():
         os.path.join(home_dir, "Projects"),
     ])
     
-    # Remove duplicates while preserving order
+    # Remove duplicates while preserving order, keeping only existing directories
     seen = set()
-    potential_dirs = [d for d in potential_dirs if d not in seen and not seen.add(d)]
+    potential_dirs = [d for d in potential_dirs if d not in seen and not seen.add(d) and _is_dir(d)]
     
     repos = []
     scanned_dirs = set()
@@ -1156,135 +1961,120 @@ def list_repositories():
         return os.path.exists(os.path.join(path, ".git"))
     
     def get_github_organization(repo_path):
-        """Get GitHub organization/user from git remote.
+        """Get GitHub organization/user from the origin remote.
         
-        Queries git remote to get the actual GitHub organization/user.
+        Reads the origin URL straight from .git/config, falling back to git
+        for layouts where .git is not a directory (worktrees, submodules).
         Returns None if not a GitHub repo or if remote can't be determined.
         """
+        remote_url = None
         try:
-            # Try to get the remote URL
-            result = subprocess.run(
-                ["git", "remote", "get-url", "origin"],
-                cwd=repo_path,
-                capture_output=True,
-                text=True,
-                timeout=2
-            )
-            
-            if result.returncode != 0:
-                # Try alternative: git remote -v
+            with open(os.path.join(repo_path, ".git", "config"), "r", encoding="utf-8", errors="replace") as f:
+                section = ORIGIN_SECTION_RE.search(f.read())
+            if section:
+                url_match = CONFIG_URL_RE.search(section.group(1))
+                remote_url = url_match.group(1) if url_match else None
+        except OSError:
+            try:
                 result = subprocess.run(
-                    ["git", "remote", "-v"],
+                    ["git", "remote", "get-url", "origin"],
                     cwd=repo_path,
                     capture_output=True,
                     text=True,
                     timeout=2
                 )
-                if result.returncode != 0 or not result.stdout:
-                    return None
-                
-                # Parse output like "origin  https://github.com/org/repo.git (fetch)"
-                lines = result.stdout.strip().split('\n')
-                for line in lines:
-                    if 'origin' in line and ('github.com' in line or 'git@github.com' in line):
-                        # Extract URL part
-                        parts = line.split()
-                        if len(parts) >= 2:
-                            remote_url = parts[1]
-                            break
-                else:
-                    return None
-            else:
-                remote_url = result.stdout.strip()
-            
-            if not remote_url:
+                if result.returncode == 0:
+                    remote_url = result.stdout.strip()
+            except (subprocess.SubprocessError, OSError):
+                # If git command fails, return None (will fall back to "Other")
                 return None
-            
-            # Parse GitHub URL to extract organization/user
-            # Formats:
-            # - https://github.com/org/repo.git
-            # - https://github.com/org/repo
-            # - git@github.com:org/repo.git
-            # - git@github.com:org/repo
-            
-            if 'github.com' in remote_url:
-                # Extract the org/repo part
-                if 'github.com/' in remote_url:
-                    # HTTPS format
-                    parts = remote_url.split('github.com/')
-                    if len(parts) > 1:
-                        org_repo = parts[1].rstrip('/').rstrip('.git')
-                        org = org_repo.split('/')[0] if '/' in org_repo else None
-                        return org
-                elif 'github.com:' in remote_url:
-                    # SSH format
-                    parts = remote_url.split('github.com:')
-                    if len(parts) > 1:
-                        org_repo = parts[1].rstrip('/').rstrip('.git')
-                        org = org_repo.split('/')[0] if '/' in org_repo else None
-                        return org
-            
-            return None
-        except (subprocess.TimeoutExpired, subprocess.SubprocessError, Exception) as e:
-            # If git command fails, return None (will fall back to "Other")
-            return None
-    
-    def scan_directory(directory, max_depth=3, current_depth=0, base_dirs=None):
-        """Recursively scan directory for git repos."""
-        if base_dirs is None:
-            base_dirs = [os.path.abspath(d) for d in potential_dirs if os.path.exists(d)]
-        
-        # Normalize directory path
-        directory = os.path.normpath(os.path.abspath(directory))
-        
-        if current_depth > max_depth or directory in scanned_dirs:
-            return
         
-        scanned_dirs.add(directory)
-        
-        if not os.path.exists(directory) or not os.path.isdir(directory):
-            return
+        if not remote_url:
+            return None
         
+        # Parse GitHub URL to extract organization/user
+        match = GITHUB_ORG_RE.search(remote_url)
+        return match.group(1) if match else None
+    
+    def lookup_organization(repo_path):
+        """get_github_organization, cached until the repo's .git/config changes."""
         try:
-            # Check if current directory is a git repo
-            if is_git_repo(directory):
-                repo_name = os.path.basename(directory)
-                # Get GitHub organization from git remote
-                organization = get_github_organization(directory)
-                # Fall back to "Other" if not a GitHub repo or can't determine org
-                if not organization:
-                    organization = "Other"
-                repos.append({
-                    "name": repo_name,
-                    "path": directory,
-                    "organization": organization
-                })
-                return  # Don't scan inside git repos
-            
-            # Only scan subdirectories if we haven't exceeded max depth
-            if current_depth < max_depth:
-                # Scan subdirectories
-                for item in os.listdir(directory):
-                    item_path = os.path.join(directory, item)
-                    # Normalize the path
-                    item_path = os.path.normpath(item_path)
-                    if os.path.isdir(item_path) and not item.startswith('.'):
-                        scan_directory(item_path, max_depth, current_depth + 1, base_dirs)
-        except (PermissionError, OSError) as e:
-            # Skip directories we can't access
-            print(f"Permission error scanning {directory}: {e}")
-            pass
-        except Exception as e:
-            print(f"Error scanning {directory}: {e}")
-            pass
+            config_mtime = os.stat(os.path.join(repo_path, ".git", "config")).st_mtime_ns
+        except OSError:
+            return get_github_organization(repo_path)
+        with repo_scan_lock:
+            cached = repo_org_cache.get(repo_path)
+        if cached and cached[0] == config_mtime:
+            return cached[1]
+        organization = get_github_organization(repo_path)
+        with repo_scan_lock:
+            repo_org_cache[repo_path] = [config_mtime, organization]
+        return organization
+
+    def scan_directories(locations, max_depth=3):
+        """Breadth-first scan of the given locations for git repos."""
+        queue = collections.deque((location, 0) for location in locations)
+        while queue:
+            directory, depth = queue.popleft()
+            if depth > max_depth or directory in scanned_dirs:
+                continue
+            scanned_dirs.add(directory)
+
+            try:
+                subdirs = []
+                if depth < max_depth:
+                    # One listing answers both "is this a repo?" and "what's below?"
+                    with os.scandir(directory) as entries:
+                        for entry in entries:
+                            if entry.name == ".git":
+                                found_repo = True
+                                break
+                            # entry.path is already normalized since directory is
+                            if not entry.name.startswith('.') and entry.is_dir():
+                                subdirs.append(entry.path)
+                        else:
+                            found_repo = False
+                else:
+                    # Deepest level is never descended into, so a single stat will do
+                    found_repo = is_git_repo(directory)
+
+                if found_repo:
+                    # Get GitHub organization from git remote
+                    organization = lookup_organization(directory)
+                    repos.append({
+                        "name": os.path.basename(directory),
+                        "path": directory,
+                        # Fall back to "Other" if not a GitHub repo or can't determine org
+                        "organization": organization or "Other"
+                    })
+                    continue  # Don't scan inside git repos
+
+                queue.extend((subdir, depth + 1) for subdir in subdirs)
+            except (PermissionError, OSError) as e:
+                # Skip directories we can't access
+                print(f"Permission error scanning {directory}: {e}")
+            except Exception as e:
+                print(f"Error scanning {directory}: {e}")
     
     # Scan common locations
     # Increase max_depth to 3 to allow scanning deeper (e.g., A:\Github -> AI-Agent -> GeminiGitAgent)
-    for location in potential_dirs:
-        location = os.path.normpath(os.path.abspath(location))
-        if os.path.exists(location) and os.path.isdir(location):
-            print(f"Scanning location: {location}")
-            scan_directory(location, max_depth=3)
+    locations = [os.path.normpath(os.path.abspath(location)) for location in potential_dirs]
+
+    # Reuse the last scan while the locations are unchanged and it is recent
+    scan_key = []
+    for location in locations:
+        try:
+            scan_key.append([location, os.stat(location).st_mtime_ns])
+        except OSError:
+            scan_key.append([location, None])
+    with repo_scan_lock:
+        if (repo_scan_cache["key"] == scan_key
+                and time.time() - repo_scan_cache["ts"] < REPO_SCAN_TTL):
+            return jsonify(repo_scan_cache["result"])
+
+    for location in locations:
+        print(f"Scanning location: {location}")
+    scan_directories(locations, max_depth=3)
     
     # Group repos by organization
     repos_by_org = {}
@@ -1306,6 +2096,13 @@ def list_repositories():
         "repos": repos,  # Keep flat list for backward compatibility
         "by_organization": {org: repos_by_org[org] for org in sorted_orgs}
     }
+
+    with repo_scan_lock:
+        repo_scan_cache.update(key=scan_key, ts=time.time(), result=result)
+        # Forget organizations of repos that were moved or deleted
+        found = {repo["path"] for repo in repos}
+        for path in [path for path in repo_org_cache if path not in found]:
+            del repo_org_cache[path]
     
     return jsonify(result)
 
@@ -1316,24 +2113,14 @@ def list_files():
     if not current_repo_path:
         return jsonify({"error": "Repository not set"}), 400
 
-    files_list = []
-    ignore_dirs = {".git", "__pycache__", "node_modules", "venv", ".idea", ".vscode"}
-
-    for root, dirs, files in os.walk(current_repo_path):
-        # Modify dirs in-place to skip ignored directories
-        dirs[:] = [d for d in dirs if d not in ignore_dirs]
-
-        for file in files:
-            full_path = os.path.join(root, file)
-            rel_path = os.path.relpath(full_path, current_repo_path)
-            files_list.append(rel_path)
-
-    return jsonify({"files": sorted(files_list)})
+    # Stream paths as the scandir walk finds them; the explorer sorts its tree itself
+    paths = _iter_files(current_repo_path, FILES_IGNORE_DIRS)
+    return Response(_stream_json_list("files", paths), mimetype="application/json")
 
 
 @app.route("/api/file", methods=["GET", "POST"])
 def handle_file():
-    global current_repo_path
+    global current_repo_path, status_map_cache
     if not current_repo_path:
         return jsonify({"error": "Repository not set"}), 400
 
@@ -1342,19 +2129,26 @@ def handle_file():
         if not rel_path:
             return jsonify({"error": "Path required"}), 400
 
-        full_path = os.path.join(current_repo_path, rel_path)
-
         # Security check: ensure path is within repo
-        if not os.path.commonpath([full_path, current_repo_path]) == current_repo_path:
+        full_path = resolve_repo_file(rel_path)
+        if not full_path:
             return jsonify({"error": "Invalid path"}), 400
 
-        if not os.path.exists(full_path):
-            return jsonify({"error": "File not found"}), 404
-
         try:
-            with open(full_path, "r", encoding="utf-8") as f:
-                content = f.read()
-            return jsonify({"content": content})
+            with open(full_path, "rb") as f:
+                if os.fstat(f.fileno()).st_size > FILE_SEND_THRESHOLD:
+                    # Large files are streamed as raw text instead of wrapped in
+                    # JSON, but only once the whole file is known to be UTF-8 text;
+                    # anything else would be corrupted by saving it back
+                    if not _is_utf8_text(f):
+                        return jsonify({"error": "Binary or non-UTF-8 file"}), 400
+                    return Response(_iter_text_file(full_path), mimetype="text/plain; charset=utf-8")
+                content = f.read().decode("utf-8")
+            # The editor works in \n; saving converts back to os.linesep, so CRLF
+            # (or CR) endings must not reach it or they'd be doubled on save
+            return jsonify({"content": content.replace("\r\n", "\n").replace("\r", "\n")})
+        except (FileNotFoundError, IsADirectoryError):
+            return jsonify({"error": "File not found"}), 404
         except UnicodeDecodeError:
             return jsonify({"error": "Binary or non-UTF-8 file"}), 400
         except Exception as e:
@@ -1368,15 +2162,23 @@ def handle_file():
         if not rel_path or content is None:
             return jsonify({"error": "Path and content required"}), 400
 
-        full_path = os.path.join(current_repo_path, rel_path)
-
         # Security check
-        if not os.path.commonpath([full_path, current_repo_path]) == current_repo_path:
+        full_path = resolve_repo_file(rel_path)
+        if not full_path:
             return jsonify({"error": "Invalid path"}), 400
 
         try:
-            with open(full_path, "w", encoding="utf-8") as f:
-                f.write(content)
+            # Encode the same way a text-mode write would (platform newlines)
+            if os.linesep != "\n":
+                content = content.replace("\n", os.linesep)
+            data = content.encode("utf-8")
+
+            # Skip the write entirely when an autosave sends identical content
+            if hashlib.blake2b(data, digest_size=20).digest() == _file_digest(full_path):
+                return jsonify({"message": "No change"})
+
+            _write_file_atomic(full_path, data)
+            status_map_cache = None  # Saved content may change the file's status
             return jsonify({"message": "File saved"})
         except Exception as e:
             return jsonify({"error": str(e)}), 500
@@ -1395,30 +2197,22 @@ def get_commit_history():
     # Use a unique delimiter that won't appear in commit messages
     # Format: %H = full hash, %h = short hash, %an = author name, %ae = author email
     # %ad = author date, %s = subject, %b = body
-    format_string = "%H|||%h|||%an|||%ae|||%ad|||%s|||%b"
-    log_output = helper.run_command(
-        f'git log --pretty=format:"{format_string}" --date=iso -n {limit}',
-        strip=False
-    )
-    
-    if not log_output:
-        return jsonify({"commits": []})
-    
+    # %x00 terminates each record so multi-line bodies stay in one commit
+    format_string = "%H|||%h|||%an|||%ae|||%ad|||%s|||%b%x00"
     commits = []
-    for line in log_output.split('\n'):
-        if not line.strip():
-            continue
-        
+    for record in helper.iter_records(
+        ["git", "log", f"--pretty=format:{format_string}", "--date=iso", "-n", str(limit)]
+    ):
         # Split by triple pipe delimiter
-        parts = line.split('|||', 6)
+        parts = record.lstrip('\n').split('|||', 6)
         if len(parts) >= 6:
             commit = {
                 "hash": parts[0].strip(),
-                "shortHash": parts[1].strip() if len(parts) > 1 else "",
-                "author": parts[2].strip() if len(parts) > 2 else "",
-                "email": parts[3].strip() if len(parts) > 3 else "",
-                "date": parts[4].strip() if len(parts) > 4 else "",
-                "message": parts[5].strip() if len(parts) > 5 else "",
+                "shortHash": parts[1].strip(),
+                "author": parts[2].strip(),
+                "email": parts[3].strip(),
+                "date": parts[4].strip(),
+                "message": parts[5].strip(),
                 "body": parts[6].strip() if len(parts) > 6 else ""
             }
             commits.append(commit)
@@ -1426,9 +2220,45 @@ def get_commit_history():
     return jsonify({"commits": commits})
 
 
+def _scan_repo_files(root_path, ignore_dirs):
+    """Return (file_count, total_bytes, extension_counter) for files under root_path.
+
+    Uses os.scandir so each file's size comes from its DirEntry rather than
+    separate isfile/getsize calls, and gathers everything in a single walk.
+    """
+    file_count = 0
+    total_size = 0
+    extensions = collections.Counter()
+    stack = [root_path]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            # Skip ignored directories
+                            if entry.name not in ignore_dirs:
+                                stack.append(entry.path)
+                        elif entry.is_file():
+                            total_size += entry.stat().st_size
+                            file_count += 1
+                            ext = _file_ext(entry.name)
+                            if ext:
+                                extensions[ext] += 1
+                    except OSError:
+                        pass
+        except OSError:
+            pass
+    return file_count, total_size, extensions
+
+
 @app.route("/api/repo/summary", methods=["GET"])
 def get_repo_summary():
-    """Get comprehensive repository summary including authors, description, and stats."""
+    """Get comprehensive repository summary including authors and stats.
+
+    The Gemini description is served separately by /api/repo/description so
+    this endpoint returns as soon as git and the disk scan are done.
+    """
     helper = get_helper()
     if not helper:
         return jsonify({"error": "Repository not set"}), 400
@@ -1439,7 +2269,6 @@ def get_repo_summary():
     summary = {
         "name": os.path.basename(current_repo_path) if current_repo_path else "",
         "path": current_repo_path or "",
-        "description": "",
         "authors": [],
         "totalCommits": 0,
         "branches": {"local": 0, "remote": 0},
@@ -1453,190 +2282,114 @@ def get_repo_summary():
         "tags": [],
         "currentBranch": None,
         "unpushedCommits": 0,
-        "behindCommits": 0
+        "behindCommits": 0,
+        "shallow": False  # Shallow clone: commit count and first commit are truncated
     }
     
+    # The git calls and disk scans below are independent, so they run concurrently
+    futures = []
+
+    def submit(fn, *args):
+        future = SUMMARY_POOL.submit(fn, *args)
+        futures.append(future)
+        return future
+
     try:
+        def git(args, strip=True):
+            return submit(helper.run_command, args, strip)
+
+        toplevel_future = git(["git", "rev-parse", "--show-toplevel"])
+        authors_future = git(["git", "shortlog", "-se", "HEAD"], strip=False)
+        commit_count_future = submit(_get_commit_count, helper)
+        # One ref walk covers branch counts and tags
+        refs_future = git(["git", "for-each-ref", "--format=%(refname)", "refs/heads", "refs/remotes", "refs/tags"], strip=False)
+        remote_url_future = git(["git", "config", "--get", "remote.origin.url"])
+        current_branch_future = git(["git", "branch", "--show-current"])
+        root_commits_future = git(["git", "rev-list", "--max-parents=0", "HEAD"])
+        shallow_future = git(["git", "rev-parse", "--is-shallow-repository"])
+        ahead_behind_future = submit(_get_ahead_behind, helper)
+        last_commit_future = submit(_commit_info, helper, "HEAD")
+        size_future = language_future = None
+        if current_repo_path:
+            ignore_dirs = {".git", "__pycache__", "node_modules", "venv", ".idea", ".vscode", "dist", "build"}
+            size_future = submit(_scan_repo_files, current_repo_path, ignore_dirs)
+            language_future = submit(detect_primary_language, current_repo_path)
+
         # Get repository name
-        repo_name = helper.run_command("git rev-parse --show-toplevel")
+        repo_name = toplevel_future.result()
         if repo_name:
             summary["name"] = os.path.basename(repo_name.strip())
         
-        # Generate description using Gemini AI
-        try:
-            # Gather repository context for Gemini
-            readme_content = ""
-            readme_files = ["README.md", "README.txt", "README", "readme.md"]
-            for readme_file in readme_files:
-                readme_path = os.path.join(current_repo_path, readme_file) if current_repo_path else None
-                if readme_path and os.path.exists(readme_path):
-                    try:
-                        with open(readme_path, 'r', encoding='utf-8', errors='ignore') as f:
-                            readme_content = f.read()[:2000]  # First 2000 chars of README
-                            break
-                    except Exception:
-                        pass
-            
-            # Get recent commit messages for context
-            recent_commits = helper.run_command("git log --oneline -n 10", strip=False) or ""
-            
-            # Get file structure (top-level files and directories)
-            top_level_items = []
-            if current_repo_path:
-                try:
-                    items = os.listdir(current_repo_path)
-                    for item in items[:20]:  # First 20 items
-                        item_path = os.path.join(current_repo_path, item)
-                        if os.path.isfile(item_path) and not item.startswith('.'):
-                            top_level_items.append(f"file: {item}")
-                        elif os.path.isdir(item_path) and not item.startswith('.'):
-                            top_level_items.append(f"directory: {item}")
-                except Exception:
-                    pass
-            
-            # Get primary language and file types
-            file_types = "Unknown"
-            if current_repo_path:
-                file_extensions = {}
-                ignore_dirs = {".git", "__pycache__", "node_modules", "venv", ".idea", ".vscode"}
-                for root, dirs, files in os.walk(current_repo_path):
-                    dirs[:] = [d for d in dirs if d not in ignore_dirs]
-                    for file in list(files)[:50]:  # Sample first 50 files
-                        ext = os.path.splitext(file)[1].lower()
-                        if ext:
-                            file_extensions[ext] = file_extensions.get(ext, 0) + 1
-                if file_extensions:
-                    file_types = ", ".join([f"{ext} ({count})" for ext, count in sorted(file_extensions.items(), key=lambda x: x[1], reverse=True)[:5]])
-            
-            repo_context = f"""
-Repository Name: {summary["name"]}
-
-Top-level:
-{chr(10).join(top_level_items[:15]) if top_level_items else "No files found"}
-
-File types:
-{file_types}
-
-Recent commits:
-{recent_commits[:500] if recent_commits else "No commits"}
-
-README snippet:
-{readme_content[:500] if readme_content else "No README"}
-"""
-
-            try:
-                description = send_gemini_prompt(repo_context, temperature=0.4)
-                if description and len(description.strip()) > 20:
-                    summary["description"] = description.strip()
-                else:
-                    summary["description"] = "Description generation failed. Repository information unavailable."
-            except RuntimeError as e:
-                # Fallback to README if Gemini fails
-                if readme_content:
-                    lines = readme_content.split('\n')
-                    description_lines = []
-                    for line in lines[:10]:
-                        line = line.strip()
-                        if line and not line.startswith('#'):
-                            description_lines.append(line)
-                        elif line.startswith('#') and len(description_lines) == 0:
-                            description_lines.append(line.lstrip('#').strip())
-                            break
-                    summary["description"] = ' '.join(description_lines[:3])[:200] if description_lines else "No description available."
-                else:
-                    summary["description"] = f"Could not generate description: {str(e)}"
-        except Exception as e:
-            print(f"Error generating description: {e}")
-            summary["description"] = "Description generation failed."
-        
-        # Get all unique authors from commit history
-        authors_output = helper.run_command("git log --format='%an|%ae'", strip=False)
-        authors_set = set()
+        # Get all unique authors; shortlog already dedupes them inside git
+        authors_output = authors_future.result()
+        authors = []
         if authors_output:
             for line in authors_output.split('\n'):
-                if '|' in line:
-                    name, email = line.split('|', 1)
-                    authors_set.add((name.strip(), email.strip()))
-        summary["authors"] = [{"name": name, "email": email} for name, email in sorted(authors_set)]
+                match = SHORTLOG_AUTHOR_RE.match(line)
+                if match:
+                    authors.append((match.group(1), match.group(2)))
+        summary["authors"] = [{"name": name, "email": email} for name, email in sorted(authors)]
         
         # Get total commit count
-        commit_count = helper.run_command("git rev-list --count HEAD")
+        commit_count = commit_count_future.result()
         if commit_count:
             summary["totalCommits"] = int(commit_count.strip())
         
-        # Get branch counts
-        local_branches = helper.run_command("git branch", strip=False)
-        remote_branches = helper.run_command("git branch -r", strip=False)
-        if local_branches:
-            summary["branches"]["local"] = len([l for l in local_branches.split('\n') if l.strip()])
-        if remote_branches:
-            summary["branches"]["remote"] = len([l for l in remote_branches.split('\n') if l.strip() and 'HEAD' not in l])
+        # Get branch counts and tags
+        tags = []
+        for ref in (refs_future.result() or "").splitlines():
+            if ref.startswith("refs/heads/"):
+                summary["branches"]["local"] += 1
+            elif ref.startswith("refs/remotes/"):
+                # Skip symbolic refs like origin/HEAD
+                if not ref.endswith("/HEAD"):
+                    summary["branches"]["remote"] += 1
+            elif ref.startswith("refs/tags/"):
+                tags.append(ref[len("refs/tags/"):])
+        summary["tags"] = sorted(tags, reverse=True)[:10]  # Latest 10 tags
         
         # Get remote URL and format it for display
-        remote_url = helper.run_command("git remote get-url origin")
+        remote_url = remote_url_future.result()
         if remote_url:
             remote_url = remote_url.strip()
             summary["remote"] = remote_url
             # Convert SSH to HTTPS URL for clicking
-            if remote_url.startswith("git@github.com:"):
-                summary["remoteUrl"] = remote_url.replace("git@github.com:", "https://github.com/").replace(".git", "")
-            elif remote_url.startswith("https://github.com/") or remote_url.startswith("http://github.com/"):
-                summary["remoteUrl"] = remote_url.replace(".git", "")
+            if remote_url.startswith(("git@github.com:", "https://github.com/", "http://github.com/")):
+                web_url = remote_url.rstrip("/")
+                if web_url.endswith(".git"):
+                    # Only the suffix; replace() also mangled names like "my.github.io"
+                    web_url = web_url[:-4]
+                if web_url.startswith("git@github.com:"):
+                    web_url = "https://github.com/" + web_url[len("git@github.com:"):]
+                summary["remoteUrl"] = web_url
             else:
                 summary["remoteUrl"] = remote_url
         
         # Get current branch
-        current_branch = helper.run_command("git branch --show-current")
+        current_branch = current_branch_future.result()
         if current_branch:
             summary["currentBranch"] = current_branch.strip()
         
         # Get unpushed/behind commits
-        status_sb = helper.run_command("git status -sb")
-        if status_sb:
-            first_line = status_sb.splitlines()[0] if status_sb.splitlines() else ""
-            if "..." in first_line:
-                import re
-                match_ahead = re.search(r"ahead (\d+)", first_line)
-                match_behind = re.search(r"behind (\d+)", first_line)
-                if match_ahead:
-                    summary["unpushedCommits"] = int(match_ahead.group(1))
-                if match_behind:
-                    summary["behindCommits"] = int(match_behind.group(1))
+        ahead_behind = ahead_behind_future.result()
+        if ahead_behind:
+            summary["unpushedCommits"], summary["behindCommits"] = ahead_behind
         
         # Get first commit
-        first_commit = helper.run_command("git log --reverse --format='%H|%an|%ad|%s' --date=iso | head -1")
-        if first_commit and '|' in first_commit:
-            parts = first_commit.split('|', 3)
-            if len(parts) >= 4:
-                summary["firstCommit"] = {
-                    "hash": parts[0],
-                    "author": parts[1],
-                    "date": parts[2],
-                    "message": parts[3]
-                }
-        
-        # Get tags
-        tags_output = helper.run_command("git tag", strip=False)
-        if tags_output:
-            tags = [t.strip() for t in tags_output.split('\n') if t.strip()]
-            summary["tags"] = sorted(tags, reverse=True)[:10]  # Latest 10 tags
+        # rev-list --max-parents=0 lists root commits directly instead of
+        # walking the whole history with log --reverse
+        # In a shallow clone the "root" is just the oldest fetched commit, so
+        # leave firstCommit unset rather than report the wrong one
+        summary["shallow"] = shallow_future.result() == "true"
+        root_commits = root_commits_future.result()
+        if root_commits and not summary["shallow"]:
+            # Oldest root is listed last
+            root_sha = root_commits.splitlines()[-1].strip()
+            summary["firstCommit"] = _commit_info(helper, root_sha)
         
         # Get file count and repository size
-        if current_repo_path:
-            file_count = 0
-            total_size = 0
-            ignore_dirs = {".git", "__pycache__", "node_modules", "venv", ".idea", ".vscode", "dist", "build"}
-            for root, dirs, files in os.walk(current_repo_path):
-                # Skip ignored directories
-                dirs[:] = [d for d in dirs if d not in ignore_dirs]
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    try:
-                        if os.path.isfile(file_path):
-                            file_count += 1
-                            total_size += os.path.getsize(file_path)
-                    except (OSError, PermissionError):
-                        pass
+        if size_future:
+            file_count, total_size, _ = size_future.result()
             summary["fileCount"] = file_count
             # Format size
             if total_size < 1024:
@@ -1649,49 +2402,181 @@ README snippet:
                 summary["repoSize"] = f"{total_size / (1024 * 1024 * 1024):.2f} GB"
         
         # Get last commit info
-        last_commit = helper.run_command("git log -1 --format='%H|%an|%ad|%s' --date=iso")
-        if last_commit and '|' in last_commit:
-            parts = last_commit.split('|', 3)
-            if len(parts) >= 4:
-                summary["lastCommit"] = {
-                    "hash": parts[0],
-                    "author": parts[1],
-                    "date": parts[2],
-                    "message": parts[3]
-                }
+        summary["lastCommit"] = last_commit_future.result()
         
         # Try to detect primary language (simple heuristic - check for common files)
-        if current_repo_path:
-            common_extensions = {
-                '.py': 'Python',
-                '.js': 'JavaScript',
-                '.ts': 'TypeScript',
-                '.java': 'Java',
-                '.cpp': 'C++',
-                '.c': 'C',
-                '.go': 'Go',
-                '.rs': 'Rust',
-                '.rb': 'Ruby',
-                '.php': 'PHP'
-            }
-            file_counts = {}
-            for root, dirs, files in os.walk(current_repo_path):
-                # Skip .git and other hidden directories
-                dirs[:] = [d for d in dirs if not d.startswith('.')]
-                for file in files:
-                    ext = os.path.splitext(file)[1].lower()
-                    if ext in common_extensions:
-                        file_counts[common_extensions[ext]] = file_counts.get(common_extensions[ext], 0) + 1
-            if file_counts:
-                summary["language"] = max(file_counts.items(), key=lambda x: x[1])[0]
+        if language_future:
+            summary["language"] = language_future.result()
     
     except Exception as e:
         print(f"Error generating repo summary: {e}")
         # Return partial summary even if some parts fail
+    finally:
+        # After a failure, drop work that hasn't started and let running git
+        # calls finish before responding, so none outlive the request
+        for future in futures:
+            future.cancel()
+        wait(futures)
     
     return jsonify(summary)
 
 
+def _describe_repo(helper, repo_path, repo_name):
+    """Ask Gemini for a short description of the repository.
+
+    Returns (description, ok). When Gemini is unavailable the description
+    falls back to the README's opening lines and ok is False.
+    """
+    # Gather repository context for Gemini
+    readme_content = ""
+    readme_files = ["README.md", "README.txt", "README", "readme.md"]
+    for readme_file in readme_files:
+        readme_path = os.path.join(repo_path, readme_file)
+        if _is_file(readme_path):
+            try:
+                with open(readme_path, 'r', encoding='utf-8', errors='ignore') as f:
+                    readme_content = f.read(2000)  # First 2000 chars of README
+                    break
+            except Exception:
+                pass
+
+    # Get file structure (top-level files and directories)
+    top_level_items = []
+    try:
+        # Stream entries and stop after 20 instead of listing the whole directory
+        with os.scandir(repo_path) as entries:
+            for entry in entries:
+                if entry.name.startswith('.'):
+                    continue
+                if entry.is_file(follow_symlinks=False):
+                    top_level_items.append(f"file: {entry.name}")
+                elif entry.is_dir(follow_symlinks=False):
+                    top_level_items.append(f"directory: {entry.name}")
+                if len(top_level_items) >= 20:
+                    break
+    except Exception:
+        pass
+
+    # Get file types from a bounded sample; the walk stops once it has enough files
+    file_types = "Unknown"
+    ignore_dirs = {".git", "__pycache__", "node_modules", "venv", ".idea", ".vscode", "dist", "build"}
+    sample = itertools.islice(_iter_files(repo_path, ignore_dirs), FILE_TYPES_SAMPLE_SIZE)
+    file_extensions = collections.Counter(
+        ext for ext in (_file_ext(path.rpartition(os.sep)[2]) for path in sample) if ext
+    )
+    if file_extensions:
+        file_types = ", ".join(f"{ext} ({count})" for ext, count in file_extensions.most_common(5))
+
+    # Get recent commit messages for context
+    recent_commits = get_recent_log(helper) or ""
+
+    repo_context = f"""
+Repository Name: {repo_name}
+
+Top-level:
+{chr(10).join(top_level_items[:15]) if top_level_items else "No files found"}
+
+File types:
+{file_types}
+
+Recent commits:
+{recent_commits[:500] if recent_commits else "No commits"}
+
+README snippet:
+{readme_content[:500] if readme_content else "No README"}
+"""
+
+    try:
+        description = send_gemini_prompt(repo_context, None, 0.4)
+        if description and len(description.strip()) > 20:
+            return description.strip(), True
+        return "Description generation failed. Repository information unavailable.", False
+    except RuntimeError as e:
+        # Fallback to README if Gemini fails
+        if readme_content:
+            lines = readme_content.split('\n')
+            description_lines = []
+            for line in lines[:10]:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    description_lines.append(line)
+                elif line.startswith('#') and len(description_lines) == 0:
+                    description_lines.append(line.lstrip('#').strip())
+                    break
+            return (' '.join(description_lines[:3])[:200] if description_lines else "No description available."), False
+        return f"Could not generate description: {str(e)}", False
+
+
+@app.route("/api/repo/description", methods=["GET"])
+def get_repo_description():
+    """Get a Gemini-written description of the repository, reused until HEAD moves."""
+    helper = get_helper()
+    if not helper:
+        return jsonify({"error": "Repository not set"}), 400
+
+    repo_path = current_repo_path
+    head = helper.cat_file("HEAD")
+    key = (repo_path, head[0] if head else None)
+    with description_lock:
+        if head and description_cache["key"] == key:
+            return jsonify({"description": description_cache["value"]})
+
+    try:
+        toplevel = helper.run_command(["git", "rev-parse", "--show-toplevel"])
+        repo_name = os.path.basename(toplevel or repo_path)
+        description, ok = _describe_repo(helper, repo_path, repo_name)
+    except Exception as e:
+        print(f"Error generating description: {e}")
+        return jsonify({"description": "Description generation failed."})
+
+    # Only keep real Gemini output so a transient failure isn't pinned to this HEAD
+    if ok and head:
+        with description_lock:
+            description_cache["key"] = key
+            description_cache["value"] = description
+    return jsonify({"description": description})
+
+
+def _commit_info(helper, spec):
+    """Return {"hash", "author", "date", "message"} for a commit, read via cat-file.
+
+    Matches `git log --format=%H|%an|%ad|%s --date=iso` without spawning git.
+    """
+    obj = helper.cat_file(spec)
+    if not obj or obj[1] != "commit":
+        return None
+    sha, _, data = obj
+    text = data.decode("utf-8", errors="replace")
+    headers, _, message = text.partition("\n\n")
+    match = COMMIT_AUTHOR_RE.search(headers)
+    if not match:
+        return None
+
+    author, epoch, sign, hours, minutes = match.groups()
+    offset = timedelta(hours=int(hours), minutes=int(minutes))
+    tz = timezone(-offset if sign == "-" else offset)
+    date = datetime.fromtimestamp(int(epoch), tz).strftime("%Y-%m-%d %H:%M:%S %z")
+    # %s is the first paragraph of the message joined onto one line
+    subject = " ".join(message.split("\n\n", 1)[0].split("\n")).strip()
+    return {"hash": sha, "author": author, "date": date, "message": subject}
+
+
+def _new_file_diff(rel_path):
+    """Build a unified diff that shows rel_path as an entirely new file."""
+    full_path = resolve_repo_file(rel_path)
+    if not full_path:
+        return ""
+
+    try:
+        with open(full_path, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    except (OSError, UnicodeDecodeError):
+        return ""
+
+    header = ["--- /dev/null", f"+++ b/{rel_path}", f"@@ -0,0 +1,{len(lines)} @@"]
+    return "\n".join(header + [f"+{line}" for line in lines])
+
+
 @app.route("/api/diff", methods=["GET"])
 def get_file_diff():
     helper = get_helper()
@@ -1702,9 +2587,17 @@ def get_file_diff():
     if not rel_path:
         return jsonify({"error": "Path required"}), 400
 
+    # Look up the file's status first so clean files skip the diff entirely
+    status_code = get_status_map(helper).get(rel_path.replace("\\", "/"))
+    if not status_code:
+        return jsonify({"diff": ""})
+
+    if classify_status(status_code) in ("untracked", "new"):
+        # Untracked or newly added: HEAD has nothing to compare against
+        return jsonify({"diff": _new_file_diff(rel_path)})
+
     # git diff HEAD -- <path> shows uncommitted changes (staged + unstaged) vs HEAD
-    # If file is untracked, diff might be empty or error.
-    diff_output = helper.run_command(f'git diff HEAD -- "{rel_path}"')
+    diff_output = helper.run_command(["git", "diff", "HEAD", "--", rel_path])
 
     if diff_output is None:
         return jsonify({"diff": ""})
@@ -1712,6 +2605,69 @@ def get_file_diff():
     return jsonify({"diff": diff_output})
 
 
+def _build_file_tree(root_path, ignore_dirs, max_depth=2, max_files=10, max_lines=50):
+    """Build an indented directory listing of root_path for prompts.
+
+    Walks depth-first with os.scandir, never descends past max_depth and
+    stops as soon as max_lines lines have been collected.
+    """
+    lines = []
+    stack = [(root_path, 0)]
+    while stack and len(lines) < max_lines:
+        directory, level = stack.pop()
+        subdirs = []
+        files = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        # Like os.walk, don't follow symlinked directories
+                        if entry.name not in ignore_dirs and not entry.is_symlink():
+                            subdirs.append(entry.path)
+                    elif len(files) < max_files:  # Limit files per dir
+                        files.append(entry.name)
+        except OSError:
+            continue
+
+        lines.append(f"{' ' * 4 * level}{os.path.basename(directory)}/")
+        lines.extend(f"{' ' * 4 * (level + 1)}{name}" for name in files)
+        if level < max_depth:
+            stack.extend((path, level + 1) for path in reversed(subdirs))
+
+    return lines[:max_lines]
+
+
+def _build_tracked_tree(helper, root_name, max_depth=2, max_files=10, max_lines=50):
+    """Build the same indented listing as _build_file_tree from the files tracked at HEAD.
+
+    Reads `git ls-tree -r` as a stream and stops git once max_lines lines have
+    been collected. Returns an empty list if HEAD has no tracked files.
+    """
+    lines = [f"{root_name}/"]
+    listed_dirs = {()}
+    files_per_dir = collections.Counter()
+    records = helper.iter_records(["git", "ls-tree", "-r", "-z", "--name-only", "HEAD"])
+    try:
+        for path in records:
+            if not path:
+                continue
+            *dirs, name = path.split("/")
+            dirs = tuple(dirs)
+            # Directories down to max_depth are listed even when their files are too deep
+            for depth in range(1, min(len(dirs), max_depth) + 1):
+                if dirs[:depth] not in listed_dirs:
+                    listed_dirs.add(dirs[:depth])
+                    lines.append(f"{' ' * 4 * depth}{dirs[depth - 1]}/")
+            if len(dirs) <= max_depth and files_per_dir[dirs] < max_files:  # Limit files per dir
+                files_per_dir[dirs] += 1
+                lines.append(f"{' ' * 4 * (len(dirs) + 1)}{name}")
+            if len(lines) >= max_lines:
+                break
+    finally:
+        records.close()
+    return lines[:max_lines] if len(lines) > 1 else []
+
+
 @app.route("/api/generate-readme", methods=["POST"])
 def generate_readme():
     """Generate a comprehensive README.md for the repository using Gemini."""
@@ -1723,60 +2679,36 @@ def generate_readme():
     if not current_repo_path:
         return jsonify({"error": "Repository path not set"}), 400
 
+    # The git log and language detection run while the file tree is built
+    executor = ThreadPoolExecutor(max_workers=2)
     try:
         # Gather context
-        # 1. File structure
-        file_structure = []
-        ignore_dirs = {".git", "__pycache__", "node_modules", "venv", ".idea", ".vscode", "dist", "build"}
-        for root, dirs, files in os.walk(current_repo_path):
-            dirs[:] = [d for d in dirs if d not in ignore_dirs]
-            level = root.replace(current_repo_path, '').count(os.sep)
-            if level > 2: continue # Limit depth
-            indent = ' ' * 4 * (level)
-            file_structure.append(f"{indent}{os.path.basename(root)}/")
-            subindent = ' ' * 4 * (level + 1)
-            for f in files[:10]: # Limit files per dir
-                file_structure.append(f"{subindent}{f}")
-        
-        structure_text = "\n".join(file_structure[:50]) # Limit total lines
+        log_future = executor.submit(helper.run_command, ["git", "log", "--oneline", "-n", "10"], False)
+        language_future = executor.submit(detect_primary_language, current_repo_path)
 
-        # 2. Recent commits
-        recent_commits = helper.run_command("git log --oneline -n 10", strip=False) or "No commits yet."
+        # 1. File structure: tracked files leave out build output and
+        # dependencies without an ignore list; walk the disk before the first commit
+        file_structure = _build_tracked_tree(helper, os.path.basename(current_repo_path))
+        if not file_structure:
+            ignore_dirs = {".git", "__pycache__", "node_modules", "venv", ".idea", ".vscode", "dist", "build"}
+            file_structure = _build_file_tree(current_repo_path, ignore_dirs)
+        structure_text = "\n".join(file_structure)
 
-        # 3. Existing README (if any)
+        # 2. Existing README (if any)
         existing_readme = ""
         readme_path = os.path.join(current_repo_path, "README.md")
-        if os.path.exists(readme_path):
+        if _is_file(readme_path):
             try:
                 with open(readme_path, 'r', encoding='utf-8') as f:
-                    existing_readme = f.read()[:1000] # Limit size
+                    existing_readme = f.read(1000) # Limit size
             except Exception:
                 pass
 
+        # 3. Recent commits
+        recent_commits = log_future.result() or "No commits yet."
+
         # 4. Get primary language
-        language = None
-        if current_repo_path:
-            common_extensions = {
-                '.py': 'Python',
-                '.js': 'JavaScript',
-                '.ts': 'TypeScript',
-                '.java': 'Java',
-                '.cpp': 'C++',
-                '.c': 'C',
-                '.go': 'Go',
-                '.rs': 'Rust',
-                '.rb': 'Ruby',
-                '.php': 'PHP'
-            }
-            file_counts = {}
-            for root, dirs, files in os.walk(current_repo_path):
-                dirs[:] = [d for d in dirs if not d.startswith('.')]
-                for file in files:
-                    ext = os.path.splitext(file)[1].lower()
-                    if ext in common_extensions:
-                        file_counts[common_extensions[ext]] = file_counts.get(common_extensions[ext], 0) + 1
-            if file_counts:
-                language = max(file_counts.items(), key=lambda x: x[1])[0]
+        language = language_future.result()
 
         prompt = f"""
 You are an expert developer. Generate a comprehensive README.md using the details below.
@@ -1821,8 +2753,163 @@ Return ONLY Markdown content (no code fences).
         return jsonify({"error": str(e)}), 500
     except Exception as e:
         return jsonify({"error": f"Failed to generate README: {str(e)}"}), 500
+    finally:
+        executor.shutdown(wait=False)
+
+
+
+def _record_rate_limit(cache_key, response):
+    """Remember GitHub's X-RateLimit-Remaining/Reset headers for a token."""
+    try:
+        remaining = int(response.headers["X-RateLimit-Remaining"])
+        reset = int(response.headers["X-RateLimit-Reset"])
+    except (KeyError, ValueError):
+        return
+    with github_repos_lock:
+        github_rate_limits[cache_key] = (remaining, reset)
+
+
+def _project_repo_page(page):
+    """Reduce a decoded page of GitHub repos to (owner, row) pairs.
+
+    Each row is a tuple of the GITHUB_REPO_FIELDS values in column order.
+
+    Projecting each page as soon as it is decoded lets the ~30 unused fields
+    per repo be freed before the remaining pages arrive.
+    """
+    return [
+        (repo["owner"]["login"], get_repo_fields(repo))
+        for repo in page
+    ]
+
+
+def _last_repo_page(response):
+    """Return the page number of the `last` link in a /user/repos response, or None."""
+    last_url = response.links.get("last", {}).get("url")
+    if not last_url:
+        return None
+    try:
+        return int(parse_qs(urlsplit(last_url).query).get("page", ["1"])[0])
+    except ValueError:
+        return None
+
+
+def _get_repo_page(page, headers, cached_pages=None):
+    """Fetch one page of /user/repos, revalidating against its cached ETag if there is one.
+
+    Returns ((etag, projected repos), response); a 304 reuses the cached page.
+    """
+    cached_page = cached_pages[page - 1] if cached_pages and page <= len(cached_pages) else None
+    if cached_page and cached_page[0]:
+        headers = {**headers, "If-None-Match": cached_page[0]}
+    response = GH_CLIENT.get(
+        f"{GITHUB_API_URL}/user/repos",
+        params={**GITHUB_REPOS_PARAMS, "page": page},
+        headers=headers
+    )
+    if response.status_code == 304 and cached_page:
+        return cached_page, response
+    response.raise_for_status()
+    return (response.headers.get("ETag"), _project_repo_page(json_loads(response.content))), response
+
+
+def _get_repo_pages(pages, headers, cached_pages=None, max_workers=8):
+    """Fetch the given pages of /user/repos concurrently, in page order."""
+    pages = list(pages)
+    if not pages:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(pages))) as executor:
+        # map() keeps page order so the "sort=updated" ordering is preserved
+        return list(executor.map(lambda page: _get_repo_page(page, headers, cached_pages), pages))
+
+
+def fetch_github_repos(token):
+    """Fetch the user's repositories grouped by owner, using the ETag/rate-limit cache.
+
+    Returns (payload, status_code). Network errors propagate as httpx.HTTPError.
+    """
+    # Accept header lives on the client; the token can change between calls
+    auth_headers = {"Authorization": f"token {token}"}
+
+    # Conditional requests: GitHub answers 304 (not counted against the
+    # rate limit) for each page that hasn't changed since its cached ETag
+    cache_key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    with github_repos_lock:
+        cached = github_repos_cache.get(cache_key)
+        rate_limit = github_rate_limits.get(cache_key)
+
+    # Nearly out of quota: don't spend it, serve the cached list until the window resets
+    if cached and rate_limit and rate_limit[0] < GITHUB_RATE_LIMIT_FLOOR and time.time() < rate_limit[1]:
+        return {**cached["payload"], "stale": True}, 200
+
+    cached_pages = cached.get("pages") if cached else None
+    try:
+        first = _get_repo_page(1, auth_headers, cached_pages)
+    except httpx.HTTPStatusError as e:
+        response = e.response
+        _record_rate_limit(cache_key, response)
+        if response.status_code == 401:
+            return {"error": "Invalid GitHub token"}, 401
+        if response.status_code in (403, 429) and cached:
+            # Rate limited: the cached list is better than an error
+            return {**cached["payload"], "stale": True}, 200
+        raise
+    _record_rate_limit(cache_key, first[1])
+
+    # A 304 carries no Link header, so the cached page count stands in for it.
+    # Every page is revalidated on its own: page 1 being unchanged says nothing
+    # about repos added, removed or renamed further down the list.
+    if first[1].status_code == 304:
+        page_count = len(cached_pages)
+    else:
+        page_count = _last_repo_page(first[1]) or 1
+    fetched = [first] + _get_repo_pages(range(2, page_count + 1), auth_headers, cached_pages)
+
+    # The list grew past the cached page count: the last page now links further
+    while fetched[-1][1].status_code != 304:
+        last_page = _last_repo_page(fetched[-1][1])
+        if not last_page or last_page <= len(fetched):
+            break
+        fetched += _get_repo_pages(range(len(fetched) + 1, last_page + 1), auth_headers)
+
+    pages = [page for page, _ in fetched]
+    # The list shrank: pages past the new end come back empty
+    while len(pages) > 1 and not pages[-1][1]:
+        pages.pop()
+    if cached and all(response.status_code == 304 for _, response in fetched):
+        return cached["payload"], 200
+
+    # Group by organization/owner: a stable sort by owner keeps each owner's
+    # repos in "updated" order and groupby then emits owners already sorted
+    repos = [repo for _, page_repos in pages for repo in page_repos]
+    repos.sort(key=lambda item: item[0].lower())
+    payload = {
+        "columns": GITHUB_REPO_FIELDS,
+        "repos": {
+            owner: [repo for _, repo in group]
+            for owner, group in itertools.groupby(repos, key=operator.itemgetter(0))
+        }
+    }
+    with github_repos_lock:
+        github_repos_cache[cache_key] = {
+            "pages": pages,
+            "payload": payload,
+            "fetched_at": time.time(),
+        }
+    return payload, 200
 
 
+def _warm_github_repos_cache():
+    """Periodically refresh the repo list cache so UI requests hit the 304 path."""
+    while True:
+        token = load_config().get("github_token")
+        if token:
+            try:
+                fetch_github_repos(token)
+            except Exception as e:
+                print(f"Background GitHub repo refresh failed: {e}")
+        time.sleep(GITHUB_REPOS_REFRESH_INTERVAL)
+
 
 @app.route("/api/github/repos", methods=["GET"])
 def list_github_repos():
@@ -1837,51 +2924,10 @@ def list_github_repos():
         return jsonify({"error": "GitHub token not configured"}), 400
         
     try:
-        headers = {
-            "Authorization": f"token {token}",
-            "Accept": "application/vnd.github.v3+json"
-        }
-        
-        # Fetch user's repos (including private ones)
-        # Use per_page=100 to get more repos (pagination might be needed for very large accounts)
-        response = requests.get(
-            "https://api.github.com/user/repos?per_page=100&sort=updated",
-            headers=headers,
-            timeout=10
-        )
-        
-        if response.status_code == 401:
-            return jsonify({"error": "Invalid GitHub token"}), 401
-            
-        response.raise_for_status()
-        repos = response.json()
-        
-        # Group by organization/owner
-        repos_by_org = {}
-        
-        for repo in repos:
-            owner = repo["owner"]["login"]
-            if owner not in repos_by_org:
-                repos_by_org[owner] = []
-                
-            repos_by_org[owner].append({
-                "name": repo["name"],
-                "full_name": repo["full_name"],
-                "private": repo["private"],
-                "html_url": repo["html_url"],
-                "clone_url": repo["clone_url"],
-                "description": repo["description"],
-                "updated_at": repo["updated_at"]
-            })
-            
-        # Sort organizations
-        sorted_orgs = sorted(repos_by_org.keys(), key=str.lower)
-        
-        return jsonify({
-            "repos": {org: repos_by_org[org] for org in sorted_orgs}
-        })
+        payload, status_code = fetch_github_repos(token)
+        return json_response(payload), status_code
         
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"GitHub API error: {e}")
         return jsonify({"error": f"Failed to fetch from GitHub: {str(e)}"}), 500
     except Exception as e:
@@ -1889,6 +2935,52 @@ def list_github_repos():
         return jsonify({"error": f"Internal error: {str(e)}"}), 500
 
 
+def _run_clone(job_id, clone_args, target_path):
+    """Run git clone for a background job and record the outcome."""
+    try:
+        # Stream stderr and keep only the last lines for the error message,
+        # instead of buffering all of git's progress output
+        process = subprocess.Popen(
+            clone_args,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True
+        )
+        stderr_tail = collections.deque(maxlen=50)
+        for line in process.stderr:
+            stderr_tail.append(line.rstrip("\n"))
+        returncode = process.wait()
+
+        if returncode == 0:
+            job = {"state": "done", "path": target_path, "message": "Repository cloned successfully"}
+        else:
+            stderr = "\n".join(stderr_tail)
+            job = {"state": "error", "path": target_path, "error": f"Git clone failed: {stderr}"}
+    except Exception as e:
+        job = {"state": "error", "path": target_path, "error": f"Failed to clone repository: {str(e)}"}
+
+    if job["state"] == "error":
+        # Release the directory reserved by clone_github_repo so a retry can use it
+        shutil.rmtree(target_path, ignore_errors=True)
+
+    with clone_jobs_lock:
+        if job_id in clone_jobs:
+            clone_jobs[job_id] = job
+
+    if job["state"] == "done":
+        # Already on a pool thread and the job is reported done, so the client
+        # isn't kept waiting; a commit-graph speeds up later log/status calls
+        try:
+            subprocess.run(
+                ["git", "-C", target_path, "maintenance", "run", "--task=commit-graph"],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=300
+            )
+        except (OSError, subprocess.SubprocessError) as e:
+            print(f"Post-clone maintenance failed for {target_path}: {e}")
+
+
 @app.route("/api/github/clone", methods=["POST"])
 def clone_github_repo():
     """Clone a repository from GitHub."""
@@ -1909,43 +3001,88 @@ def clone_github_repo():
         github_path = os.path.join(os.path.expanduser("~"), "Documents", "GitHub")
         
     # Ensure directory exists
-    if not os.path.exists(github_path):
-        try:
-            os.makedirs(github_path)
-        except Exception as e:
-            return jsonify({"error": f"Failed to create directory {github_path}: {str(e)}"}), 500
+    try:
+        os.makedirs(github_path, exist_ok=True)
+    except Exception as e:
+        return jsonify({"error": f"Failed to create directory {github_path}: {str(e)}"}), 500
             
     try:
-        # Extract repo name from URL
+        # Extract repo name from URL, ignoring query/fragment and trailing slashes
         # e.g. https://github.com/owner/repo.git -> repo
-        repo_name = repo_url.split("/")[-1]
+        repo_name = posixpath.basename(urlsplit(repo_url).path.rstrip("/"))
         if repo_name.endswith(".git"):
             repo_name = repo_name[:-4]
+        if repo_name in ("", ".", ".."):
+            return jsonify({"error": f"Could not determine repository name from URL: {repo_url}"}), 400
             
         target_path = os.path.join(github_path, repo_name)
-        
-        if os.path.exists(target_path):
+
+        # Make sure the target can't escape the GitHub directory
+        real_github_path = os.path.realpath(github_path)
+        if os.path.commonpath([os.path.realpath(target_path), real_github_path]) != real_github_path:
+            return jsonify({"error": f"Invalid target path: {target_path}"}), 400
+
+        # Reserve the directory atomically; git clone accepts an existing empty directory
+        try:
+            os.makedirs(target_path, exist_ok=False)
+        except FileExistsError:
             return jsonify({"error": f"Directory already exists: {target_path}"}), 400
             
-        # Run git clone
-        result = subprocess.run(
-            ["git", "clone", repo_url, target_path],
-            capture_output=True,
-            text=True,
-            check=False
-        )
-        
-        if result.returncode != 0:
-            return jsonify({"error": f"Git clone failed: {result.stderr}"}), 500
+        # Shallow, blobless clone unless full history is requested; `git fetch
+        # --unshallow` can fetch the rest later. Blobs are only fetched for the
+        # checked-out tree, so the extra depth is cheap. --depth implies
+        # --single-branch, which would hide every other remote branch from the
+        # branch list and switcher, so all branches are fetched (shallowly)
+        clone_args = ["git", "clone", "--quiet"]
+        if not data.get("full"):
+            clone_args += [f"--depth={CLONE_DEPTH}", "--filter=blob:none", "--no-single-branch"]
+        clone_args += [repo_url, target_path]
+
+        # Run git clone in the background; clients poll the status endpoint
+        job_id = uuid.uuid4().hex
+        with clone_jobs_lock:
+            clone_jobs[job_id] = {"state": "running", "path": target_path}
+            # Cap memory by evicting the oldest jobs
+            while len(clone_jobs) > MAX_CLONE_JOBS:
+                clone_jobs.popitem(last=False)
+        CLONE_POOL.submit(_run_clone, job_id, clone_args, target_path)
             
         return jsonify({
-            "message": "Repository cloned successfully",
+            "message": "Clone started",
+            "job_id": job_id,
             "path": target_path
-        })
+        }), 202
         
     except Exception as e:
         return jsonify({"error": f"Failed to clone repository: {str(e)}"}), 500
 
 
+@app.route("/api/github/clone/status/<job_id>", methods=["GET"])
+def clone_status(job_id):
+    """Get the state of a background clone job."""
+    with clone_jobs_lock:
+        job = clone_jobs.get(job_id)
+        job = dict(job) if job else None
+
+    if not job:
+        return jsonify({"error": "Clone job not found"}), 404
+    return jsonify(job)
+
+
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5000, debug=True)
+    # Warm the GitHub repo list cache so the first request doesn't pay a full fetch
+    threading.Thread(target=_warm_github_repos_cache, daemon=True).start()
+
+    if os.environ.get("DEV"):
+        # Flask development server with debugger and reloader
+        app.run(host="0.0.0.0", port=5000, debug=True)
+    else:
+        try:
+            from waitress import serve
+        except ImportError:
+            print("waitress is not installed; falling back to the Flask server.", file=sys.stderr)
+            app.run(host="0.0.0.0", port=5000, threaded=True)
+        else:
+            # Gemini calls hold a worker while waiting on the network, so keep
+            # enough threads for several in-flight prompts plus the pollers
+            serve(app, host="0.0.0.0", port=5000, threads=16)
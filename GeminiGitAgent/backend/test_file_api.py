@@ -0,0 +1,97 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import server
+
+
+class FileRoundTripTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.repo = os.path.realpath(self.tmp.name)
+        server.current_repo_path = self.repo
+        server.current_repo_prefix = os.path.join(self.repo, "")
+        self.client = server.app.test_client()
+
+    def tearDown(self):
+        server.current_repo_path = None
+        server.current_repo_prefix = None
+        self.tmp.cleanup()
+
+    def round_trip(self, name, data):
+        """Write data, open it in the editor and save it back unchanged."""
+        path = os.path.join(self.repo, name)
+        with open(path, "wb") as f:
+            f.write(data)
+
+        response = self.client.get("/api/file", query_string={"path": name})
+        self.assertEqual(response.status_code, 200)
+        if response.is_json:
+            content = response.get_json()["content"]
+        else:
+            content = response.get_data(as_text=True)
+        self.assertNotIn("\r", content)
+
+        response = self.client.post("/api/file", json={"path": name, "content": content})
+        self.assertEqual(response.status_code, 200)
+        with open(path, "rb") as f:
+            return f.read()
+
+    def test_crlf_file_saved_unchanged_on_windows(self):
+        with mock.patch.object(os, "linesep", "\r\n"):
+            data = self.round_trip("crlf.txt", b"one\r\ntwo\r\n")
+        self.assertEqual(data, b"one\r\ntwo\r\n")
+
+    def test_lf_file_saved_unchanged(self):
+        with mock.patch.object(os, "linesep", "\n"):
+            data = self.round_trip("lf.txt", b"one\ntwo\n")
+        self.assertEqual(data, b"one\ntwo\n")
+
+    def test_large_crlf_file_saved_unchanged_on_windows(self):
+        # Crosses the streaming threshold and splits \r\n across read chunks
+        data = b"x" * (64 * 1024 - 1) + b"\r\n" + b"line\r\n" * 1000
+        with mock.patch.object(server, "FILE_SEND_THRESHOLD", 1024), \
+                mock.patch.object(os, "linesep", "\r\n"):
+            self.assertEqual(self.round_trip("big.txt", data), data)
+
+
+class FileListTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.repo = os.path.realpath(self.tmp.name)
+        os.makedirs(os.path.join(self.repo, "real"))
+        with open(os.path.join(self.repo, "real", "f.txt"), "w") as f:
+            f.write("x")
+        server.current_repo_path = self.repo
+        server.current_repo_prefix = os.path.join(self.repo, "")
+
+    def tearDown(self):
+        server.current_repo_path = None
+        server.current_repo_prefix = None
+        server.cached_files_set = None
+        server.cached_files_list = None
+        server.cached_files_hash = None
+        self.tmp.cleanup()
+
+    def files(self):
+        return server.app.test_client().get("/api/files").get_json()["files"]
+
+    @unittest.skipUnless(hasattr(os, "symlink"), "needs symlinks")
+    def test_directory_symlink_is_not_listed(self):
+        try:
+            os.symlink(os.path.join(self.repo, "real"), os.path.join(self.repo, "link"),
+                       target_is_directory=True)
+        except OSError:
+            self.skipTest("cannot create symlinks here")
+
+        server.update_files_cache()
+        self.assertEqual(self.files(), [os.path.join("real", "f.txt")])
+
+        # The watcher's incremental path must agree with a full scan
+        server.apply_file_changes(["link"])
+        self.assertEqual(self.files(), [os.path.join("real", "f.txt")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import subprocess
+import tempfile
+import unittest
+
+import server
+from git_helper import GitHelper
+
+
+def git(repo, *args):
+    subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True)
+
+
+class IncrementalStatusRefreshTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.repo = self.tmp.name
+        git(self.repo, "init", "-q")
+        server.current_repo_path = self.repo
+        server.git_helper = GitHelper(self.repo)
+        server.status_map_cache = None
+
+    def tearDown(self):
+        server.git_helper.close()
+        server.current_repo_path = None
+        server.git_helper = None
+        server.status_map_cache = None
+        self.tmp.cleanup()
+
+    def write(self, name, content):
+        path = os.path.join(self.repo, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+
+    def test_changed_file_refreshes_incrementally(self):
+        self.write("foo.log", "x")
+        server.update_status_cache()
+        self.write("bar.txt", "y")
+        server.update_status_cache(["bar.txt"])
+        self.assertEqual(server.status_map_cache[1], {"bar.txt": "??", "foo.log": "??"})
+
+    def test_gitignore_change_refreshes_untouched_paths(self):
+        self.write("foo.log", "x")
+        server.update_status_cache()
+        self.assertEqual(server.status_map_cache[1], {"foo.log": "??"})
+
+        self.write(".gitignore", "foo.log\n")
+        server.update_status_cache([".gitignore"])
+        self.assertEqual(server.status_map_cache[1], {".gitignore": "??"})
+
+    def test_nested_gitignore_change_refreshes_untouched_paths(self):
+        self.write(os.path.join("sub", "foo.log"), "x")
+        server.update_status_cache()
+
+        self.write(os.path.join("sub", ".gitignore"), "foo.log\n")
+        server.update_status_cache([os.path.join("sub", ".gitignore")])
+        self.assertEqual(server.status_map_cache[1], {"sub/.gitignore": "??"})
+
+
+if __name__ == "__main__":
+    unittest.main()
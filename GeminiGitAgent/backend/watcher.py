@@ -1,23 +1,52 @@
 import ctypes
 import os
+import struct
 import threading
+import time
 from ctypes import wintypes
 
 FILE_LIST_DIRECTORY = 0x0001
 FILE_SHARE_ALL = 0x0007  # read | write | delete
 OPEN_EXISTING = 0x0003
 FILE_FLAG_BACKUP_SEMANTICS = 0x02000000
+FILE_FLAG_OVERLAPPED = 0x40000000
+INFINITE = 0xFFFFFFFF
 
+# Attribute-only changes (archive bit, indexers, antivirus) never change what git
+# reports, so FILE_NOTIFY_CHANGE_ATTRIBUTES (0x4) is deliberately left out.
 FILE_NOTIFY_CHANGE_FLAGS = (
     0x00000001  # FILE_NOTIFY_CHANGE_FILE_NAME
     | 0x00000002  # FILE_NOTIFY_CHANGE_DIR_NAME
-    | 0x00000004  # FILE_NOTIFY_CHANGE_ATTRIBUTES
     | 0x00000008  # FILE_NOTIFY_CHANGE_SIZE
     | 0x00000010  # FILE_NOTIFY_CHANGE_LAST_WRITE
     | 0x00000040  # FILE_NOTIFY_CHANGE_CREATION
 )
 
+ERROR_INVALID_PARAMETER = 87
 ERROR_OPERATION_ABORTED = 995
+ERROR_NOTIFY_ENUM_DIR = 1022  # Too many changes to report; rescan everything
+
+# Notification buffer size. Large checkouts or installs overflow small buffers;
+# network shares reject anything above 64 KiB.
+NOTIFY_BUFFER_SIZE = 256 * 1024
+NOTIFY_BUFFER_SIZE_REMOTE = 64 * 1024
+
+# Completion keys on the watcher's I/O completion port
+KEY_DIRECTORY = 1
+KEY_STOP = 2
+
+# FILE_NOTIFY_INFORMATION header: NextEntryOffset, Action, FileNameLength
+FILE_NOTIFY_HEADER = struct.Struct("<III")
+
+
+class OVERLAPPED(ctypes.Structure):
+    _fields_ = [
+        ("Internal", ctypes.c_size_t),
+        ("InternalHigh", ctypes.c_size_t),
+        ("Offset", wintypes.DWORD),
+        ("OffsetHigh", wintypes.DWORD),
+        ("hEvent", wintypes.HANDLE),
+    ]
 
 
 if os.name == "nt":
@@ -47,6 +76,31 @@ if os.name == "nt":
     ]
     kernel32.ReadDirectoryChangesW.restype = wintypes.BOOL
 
+    kernel32.CreateIoCompletionPort.argtypes = [
+        wintypes.HANDLE,
+        wintypes.HANDLE,
+        ctypes.c_size_t,
+        wintypes.DWORD,
+    ]
+    kernel32.CreateIoCompletionPort.restype = wintypes.HANDLE
+
+    kernel32.GetQueuedCompletionStatus.argtypes = [
+        wintypes.HANDLE,
+        ctypes.POINTER(wintypes.DWORD),
+        ctypes.POINTER(ctypes.c_size_t),
+        ctypes.POINTER(ctypes.c_void_p),
+        wintypes.DWORD,
+    ]
+    kernel32.GetQueuedCompletionStatus.restype = wintypes.BOOL
+
+    kernel32.PostQueuedCompletionStatus.argtypes = [
+        wintypes.HANDLE,
+        wintypes.DWORD,
+        ctypes.c_size_t,
+        ctypes.c_void_p,
+    ]
+    kernel32.PostQueuedCompletionStatus.restype = wintypes.BOOL
+
     kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
     kernel32.CloseHandle.restype = wintypes.BOOL
 
@@ -66,6 +120,10 @@ class RepositoryWatcher:
     whenever files beneath `repo_path` change. The watcher debounces events and
     invokes the provided callback on a background thread, mirroring how GitHub
     Desktop refreshes repositories on Windows.
+
+    The callback receives the set of repo-relative paths that changed since
+    the last call, or None when the changes are unknown (initial refresh or a
+    notification buffer overflow) and everything should be rescanned.
     """
 
     def __init__(self, repo_path, callback, debounce_interval=0.5):
@@ -75,10 +133,19 @@ class RepositoryWatcher:
 
         self._stop_event = threading.Event()
         self._thread = None
-        self._timer = None
+        # Debounce: one long-lived thread waits for the deadline, which each new
+        # event pushes back, instead of starting a Timer thread per event
+        self._deadline = None
+        self._wake = threading.Event()
+        self._debounce_thread = None
         self._lock = threading.Lock()
+        # Held while the callback runs so at most one runs at a time
+        self._callback_lock = threading.Lock()
         self._handle = None
+        self._port = None
         self._change_event = threading.Event()
+        self._pending_paths = set()
+        self._pending_overflow = False
 
     def start(self):
         if self._thread and self._thread.is_alive():
@@ -87,34 +154,46 @@ class RepositoryWatcher:
         if os.name != "nt" or kernel32 is None:
             print("RepositoryWatcher currently supports only Windows hosts.")
             # Still perform an initial refresh so status is available.
-            self._invoke_callback()
+            self._invoke_callback(full_refresh=True)
             return
 
         self._stop_event.clear()
+        # The port exists before the thread starts so stop() can always post to it
+        port = kernel32.CreateIoCompletionPort(INVALID_HANDLE_VALUE, None, 0, 1)
+        if not port:
+            print(f"Failed to watch {self.repo_path}: {ctypes.WinError(ctypes.get_last_error())}")
+            self._invoke_callback(full_refresh=True)
+            return
+        self._port = port
         self._thread = threading.Thread(target=self._watch_loop, daemon=True)
         self._thread.start()
+        self._debounce_thread = threading.Thread(target=self._debounce_loop, daemon=True)
+        self._debounce_thread.start()
         # Prime the cache immediately
-        self._invoke_callback(notify=False)
+        self._invoke_callback(notify=False, full_refresh=True)
 
     def stop(self):
         self._stop_event.set()
-        if self._handle:
-            try:
-                kernel32.CancelIoEx(self._handle, None)
-            except AttributeError:
-                # CancelIoEx is unavailable on very old Windows builds; closing the
-                # handle also breaks ReadDirectoryChangesW.
-                pass
-            kernel32.CloseHandle(self._handle)
-            self._handle = None
+        with self._lock:
+            # The watch thread closes the port on its way out
+            if self._port:
+                kernel32.PostQueuedCompletionStatus(self._port, 0, KEY_STOP, None)
 
         if self._thread:
             self._thread.join(timeout=2)
 
         with self._lock:
-            if self._timer:
-                self._timer.cancel()
-                self._timer = None
+            self._deadline = None
+        self._wake.set()
+        if self._debounce_thread:
+            self._debounce_thread.join(timeout=2)
+
+    def is_watching(self):
+        """
+        Returns True while change notifications are being received, so callers
+        can rely on events instead of rescanning.
+        """
+        return bool(self._thread and self._thread.is_alive() and self._handle)
 
     def consume_change(self):
         """
@@ -126,6 +205,7 @@ class RepositoryWatcher:
         return changed
 
     def _watch_loop(self):
+        port = self._port
         try:
             handle = kernel32.CreateFileW(
                 self.repo_path,
@@ -133,68 +213,174 @@ class RepositoryWatcher:
                 FILE_SHARE_ALL,
                 None,
                 OPEN_EXISTING,
-                FILE_FLAG_BACKUP_SEMANTICS,
+                FILE_FLAG_BACKUP_SEMANTICS | FILE_FLAG_OVERLAPPED,
                 None,
             )
             if handle == INVALID_HANDLE_VALUE:
                 raise ctypes.WinError(ctypes.get_last_error())
+            if not kernel32.CreateIoCompletionPort(handle, port, KEY_DIRECTORY, 0):
+                error = ctypes.WinError(ctypes.get_last_error())
+                kernel32.CloseHandle(handle)
+                raise error
         except Exception as exc:
             print(f"Failed to watch {self.repo_path}: {exc}")
-            self._invoke_callback()
+            self._close_port()
+            self._invoke_callback(full_refresh=True)
             return
 
         self._handle = handle
-        buffer_length = 32 * 1024
+        buffer_length = NOTIFY_BUFFER_SIZE
         result_buffer = ctypes.create_string_buffer(buffer_length)
-        bytes_returned = wintypes.DWORD()
+        overlapped = OVERLAPPED()
+        bytes_transferred = wintypes.DWORD()
+        completion_key = ctypes.c_size_t()
+        completed = ctypes.c_void_p()
+
+        def arm():
+            # Queue the next read; it completes on the port when changes arrive
+            return kernel32.ReadDirectoryChangesW(
+                handle,
+                ctypes.byref(result_buffer),
+                buffer_length,
+                True,
+                FILE_NOTIFY_CHANGE_FLAGS,
+                None,
+                ctypes.addressof(overlapped),
+                None,
+            )
+
+        armed = bool(arm())
+        if not armed and ctypes.get_last_error() == ERROR_INVALID_PARAMETER:
+            # Network share: retry with the largest buffer it accepts
+            buffer_length = NOTIFY_BUFFER_SIZE_REMOTE
+            result_buffer = ctypes.create_string_buffer(buffer_length)
+            armed = bool(arm())
+        if not armed:
+            print(f"ReadDirectoryChangesW error {ctypes.get_last_error()}, not watching")
 
         try:
-            while not self._stop_event.is_set():
-                success = kernel32.ReadDirectoryChangesW(
-                    handle,
-                    ctypes.byref(result_buffer),
-                    buffer_length,
-                    True,
-                    FILE_NOTIFY_CHANGE_FLAGS,
-                    ctypes.byref(bytes_returned),
-                    None,
-                    None,
+            while armed and not self._stop_event.is_set():
+                success = kernel32.GetQueuedCompletionStatus(
+                    port,
+                    ctypes.byref(bytes_transferred),
+                    ctypes.byref(completion_key),
+                    ctypes.byref(completed),
+                    INFINITE,
                 )
+                if completion_key.value == KEY_STOP:
+                    break
+                armed = False  # The read that was queued has now completed
                 if not success:
                     error = ctypes.get_last_error()
-                    if error == ERROR_OPERATION_ABORTED:
+                    if error == ERROR_OPERATION_ABORTED or not completed.value:
                         break
-                    # Transient error; wait briefly and retry
-                    print(f"ReadDirectoryChangesW error {error}, retrying...")
-                    continue
+                    # Overflow or a failed read: re-arm and let the caller rescan
+                    if error != ERROR_NOTIFY_ENUM_DIR:
+                        print(f"ReadDirectoryChangesW error {error}, retrying...")
+                    data = None
+                else:
+                    # Zero bytes means the buffer overflowed and events were dropped.
+                    # Copy the results out before the buffer is handed back to the kernel;
+                    # string_at copies only the filled bytes, not the whole buffer like .raw
+                    data = ctypes.string_at(result_buffer, bytes_transferred.value) if bytes_transferred.value else None
 
-                self._schedule_callback()
+                armed = bool(arm())
+                if not armed:
+                    print(f"ReadDirectoryChangesW error {ctypes.get_last_error()}, stopping watcher")
+                self._schedule_callback(_parse_notifications(data) if data else None)
         finally:
-            kernel32.CloseHandle(handle)
+            if armed:
+                # The kernel still owns the buffer; cancel the read and wait for it
+                # to complete before the buffer can be freed
+                try:
+                    kernel32.CancelIoEx(handle, ctypes.addressof(overlapped))
+                except AttributeError:
+                    pass
+                kernel32.CloseHandle(handle)
+                while kernel32.GetQueuedCompletionStatus(
+                    port,
+                    ctypes.byref(bytes_transferred),
+                    ctypes.byref(completion_key),
+                    ctypes.byref(completed),
+                    1000,
+                ) or completed.value:
+                    if completion_key.value == KEY_DIRECTORY:
+                        break
+            else:
+                kernel32.CloseHandle(handle)
             self._handle = None
+            self._close_port()
 
-    def _schedule_callback(self):
+    def _close_port(self):
         with self._lock:
-            if self._timer:
-                self._timer.cancel()
+            port, self._port = self._port, None
+        if port:
+            kernel32.CloseHandle(port)
 
-            self._timer = threading.Timer(self.debounce_interval, self._invoke_callback)
-            self._timer.daemon = True
-            self._timer.start()
-
-    def _invoke_callback(self, notify=True):
+    def _schedule_callback(self, changed_paths=None):
         with self._lock:
-            if self._timer:
-                self._timer.cancel()
-                self._timer = None
+            if changed_paths is None:
+                self._pending_overflow = True
+            else:
+                self._pending_paths.update(changed_paths)
 
-        if not self.callback:
-            return
+            # During a burst a deadline is already pending; the debounce thread will
+            # wake at the old one and see it was pushed back, so don't wake it early
+            already_pending = self._deadline is not None
+            self._deadline = time.monotonic() + self.debounce_interval
+        if not already_pending:
+            self._wake.set()
 
-        try:
-            self.callback()
-        except Exception as exc:
-            print(f"Watcher callback error: {exc}")
-        finally:
-            if notify:
-                self._change_event.set()
+    def _debounce_loop(self):
+        while not self._stop_event.is_set():
+            # Clear before reading the deadline so a wake-up in between isn't lost
+            self._wake.clear()
+            with self._lock:
+                deadline = self._deadline
+            if deadline is None:
+                self._wake.wait()
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining > 0:
+                self._wake.wait(remaining)
+                continue
+            self._invoke_callback()
+
+    def _invoke_callback(self, notify=True, full_refresh=False):
+        # The initial refresh (caller's thread) and debounced refreshes (debounce
+        # thread) can overlap; serialize them, and take the pending changes only
+        # once it's our turn so none are lost. Changes arriving while the callback
+        # runs set a new deadline, which the debounce thread honours afterwards.
+        with self._callback_lock:
+            with self._lock:
+                self._deadline = None
+                changed_paths = self._pending_paths
+                if full_refresh or self._pending_overflow or not changed_paths:
+                    changed_paths = None
+                self._pending_paths = set()
+                self._pending_overflow = False
+
+            if not self.callback:
+                return
+
+            try:
+                self.callback(changed_paths)
+            except Exception as exc:
+                print(f"Watcher callback error: {exc}")
+            finally:
+                if notify:
+                    self._change_event.set()
+
+
+def _parse_notifications(data):
+    """Return the relative paths named in a buffer of FILE_NOTIFY_INFORMATION records."""
+    paths = set()
+    offset = 0
+    while offset + FILE_NOTIFY_HEADER.size <= len(data):
+        next_offset, _action, name_length = FILE_NOTIFY_HEADER.unpack_from(data, offset)
+        name_start = offset + FILE_NOTIFY_HEADER.size
+        paths.add(data[name_start:name_start + name_length].decode("utf-16-le", errors="replace"))
+        if not next_offset:
+            break
+        offset += next_offset
+    return paths
@@ -20,6 +20,7 @@ function App() {
   
   // Ref to track last status string for change detection without causing re-renders
   const lastStatusRef = useRef(null)
+  const lastSummaryRef = useRef(null)
   // Ref to prevent concurrent handleManualUpdate calls
   const isUpdatingRef = useRef(false)
   // Ref to track file list changes and trigger FileExplorer refresh
@@ -33,6 +34,7 @@ function App() {
   const [showChat, setShowChat] = useState(false)
   const [showSummary, setShowSummary] = useState(false)
   const [repoSummary, setRepoSummary] = useState(null)
+  const [repoDescription, setRepoDescription] = useState('')
   const [loadingSummary, setLoadingSummary] = useState(false)
   const [updatingReadme, setUpdatingReadme] = useState(false)
 
@@ -50,6 +52,7 @@ function App() {
       await axios.post(`${API_URL}/set-repo`, { path })
       setRepoPath(path)
       lastStatusRef.current = null // Reset ref for new repo
+      lastSummaryRef.current = null
       addLog(`Repository set to: ${path}`)
       
       // Immediately fetch status with force=true to get initial summary
@@ -83,6 +86,7 @@ function App() {
     setStatusData(null)
     setPolling(false)
     lastStatusRef.current = null
+    lastSummaryRef.current = null
     fileRefreshTriggerRef.current = 0
     setFileRefreshTrigger(0)
     addLog('Repository selection reset.')
@@ -182,7 +186,17 @@ function App() {
           const backendIndicatesChange = res.data.has_changed === true
           const filesChanged = res.data.files_changed === true
           const isFirstPoll = lastStatusRef.current === null
-          
+          // Analyses finish in the background and show up on a later poll
+          const summaryArrived = Boolean(res.data.summary) && res.data.summary !== lastSummaryRef.current
+          if (res.data.summary) {
+            lastSummaryRef.current = res.data.summary
+          }
+
+          if (summaryArrived && !statusChanged && !backendIndicatesChange && !isFirstPoll) {
+            setStatusData(res.data)
+            addLog(`Analysis: ${res.data.summary}`)
+          }
+
           // Update if anything changed or this is the first poll
           if (statusChanged || backendIndicatesChange || isFirstPoll) {
             // Update ref before UI update
@@ -242,12 +256,26 @@ function App() {
     }
   }, [repoPath, polling])
 
+  const waitForExecution = async (jobId) => {
+    while (true) {
+      await new Promise(resolve => setTimeout(resolve, 500))
+      const res = await axios.get(`${API_URL}/execute/status/${jobId}`)
+      if (res.data.state !== 'running') {
+        return res.data
+      }
+    }
+  }
+
   const executeDSL = async (dsl) => {
     try {
       addLog('Executing DSL script...')
       const res = await axios.post(`${API_URL}/execute`, { dsl })
+      const job = await waitForExecution(res.data.job_id)
+      if (job.state !== 'done') {
+        throw new Error(job.error || 'Execution failed')
+      }
       addLog('Execution complete.')
-      addLog(`Output:\n${res.data.output}`)
+      addLog(`Output:\n${job.output}`)
       // Refresh status immediately
       handleManualUpdate(true)
     } catch (err) {
@@ -312,6 +340,14 @@ function App() {
                 onClick={async () => {
                   if (!showSummary) {
                     setLoadingSummary(true)
+                    // The Gemini description is slower, so it fills in after the summary shows
+                    setRepoDescription('Generating description...')
+                    axios.get(`${API_URL}/repo/description`)
+                      .then(res => setRepoDescription(res.data.description))
+                      .catch(err => {
+                        console.error('Failed to fetch repo description:', err)
+                        setRepoDescription('Description generation failed.')
+                      })
                     try {
                       const res = await axios.get(`${API_URL}/repo/summary`)
                       setRepoSummary(res.data)
@@ -552,7 +588,7 @@ function App() {
             </div>
 
             {/* Description */}
-            {repoSummary.description && (
+            {repoDescription && (
               <div style={{ marginBottom: '16px', paddingBottom: '16px', borderBottom: '1px solid #30363d' }}>
                 <h4 style={{ margin: '0 0 8px 0', color: '#c9d1d9', fontSize: '0.95em', fontWeight: '600' }}>
                   Description
@@ -565,7 +601,7 @@ function App() {
                   whiteSpace: 'pre-wrap',
                   wordWrap: 'break-word'
                 }}>
-                  {repoSummary.description}
+                  {repoDescription}
                 </p>
               </div>
             )}
@@ -623,7 +659,12 @@ function App() {
                 Statistics
               </h4>
               <div style={{ display: 'flex', flexDirection: 'column', gap: '6px', fontSize: '0.9em', color: '#8b949e' }}>
-                <div>Total Commits: <span style={{ color: '#c9d1d9' }}>{repoSummary.totalCommits}</span></div>
+                <div>
+                  Total Commits: <span style={{ color: '#c9d1d9' }}>{repoSummary.totalCommits}{repoSummary.shallow ? '+' : ''}</span>
+                  {repoSummary.shallow && (
+                    <span title="Only recent history was cloned; run git fetch --unshallow to get the rest"> (shallow clone)</span>
+                  )}
+                </div>
                 <div>Files: <span style={{ color: '#c9d1d9' }}>{repoSummary.fileCount || 0}</span></div>
                 {repoSummary.repoSize && (
                   <div>Repository Size: <span style={{ color: '#c9d1d9' }}>{repoSummary.repoSize}</span></div>
@@ -21,8 +21,10 @@ function FileEditor({ filePath, onClose }) {
     const loadFile = async () => {
         setLoading(true)
         try {
-            const res = await axios.get(`${API_URL}/file`, { params: { path: filePath } })
-            setContent(res.data.content)
+            // Large files come back as plain text rather than JSON
+            const res = await axios.get(`${API_URL}/file`, { params: { path: filePath }, responseType: 'text' })
+            const isJson = (res.headers['content-type'] || '').includes('application/json')
+            setContent(isJson ? JSON.parse(res.data).content : res.data)
             setError(null)
         } catch (err) {
             setError('Failed to load file')
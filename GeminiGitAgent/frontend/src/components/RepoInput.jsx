@@ -34,6 +34,7 @@ function RepoInput({ onSetRepo, currentPath, onReset, onUpdate }) {
     const [loadingGithubRepos, setLoadingGithubRepos] = useState(false)
     const [expandedGithubOrgs, setExpandedGithubOrgs] = useState({})
     const [cloningRepo, setCloningRepo] = useState(null)
+    const [cloneFullHistory, setCloneFullHistory] = useState(false)
     const folderInputRef = useRef(null)
 
     const fetchGithubToken = async () => {
@@ -96,9 +97,17 @@ function RepoInput({ onSetRepo, currentPath, onReset, onUpdate }) {
         setLoadingGithubRepos(true)
         try {
             const res = await axios.get(`${API_URL}/github/repos`)
-            setGithubRepos(res.data.repos || {})
+            // Repos arrive as rows in `columns` order; rebuild objects for rendering
+            const columns = res.data.columns || []
+            const repos = Object.fromEntries(
+                Object.entries(res.data.repos || {}).map(([org, rows]) => [
+                    org,
+                    rows.map(row => Object.fromEntries(columns.map((column, i) => [column, row[i]])))
+                ])
+            )
+            setGithubRepos(repos)
             // Auto-expand all organizations
-            const orgs = Object.keys(res.data.repos || {})
+            const orgs = Object.keys(repos)
             const expanded = {}
             orgs.forEach(org => {
                 expanded[org] = true
@@ -119,6 +128,17 @@ function RepoInput({ onSetRepo, currentPath, onReset, onUpdate }) {
         }))
     }
 
+    // Clones run in the background on the server; poll until the job finishes
+    const waitForCloneJob = async (jobId) => {
+        while (true) {
+            await new Promise(resolve => setTimeout(resolve, 1000))
+            const res = await axios.get(`${API_URL}/github/clone/status/${jobId}`)
+            if (res.data.state !== 'running') {
+                return res.data
+            }
+        }
+    }
+
     const handleClone = async (repoUrl, repoName) => {
         if (!confirm(`Clone ${repoName} to ${githubPath}\\${repoName}?`)) {
             return
@@ -127,18 +147,23 @@ function RepoInput({ onSetRepo, currentPath, onReset, onUpdate }) {
         setCloningRepo(repoUrl)
         try {
             const res = await axios.post(`${API_URL}/github/clone`, {
-                repo_url: repoUrl
+                repo_url: repoUrl,
+                full: cloneFullHistory
             })
+            const job = await waitForCloneJob(res.data.job_id)
+            if (job.state !== 'done') {
+                throw new Error(job.error || 'Failed to clone repository')
+            }
             alert(`Successfully cloned ${repoName}!`)
             // Refresh local repos
             fetchAllRepos()
             // Optionally set as active repo
             if (confirm(`Successfully cloned ${repoName}. Open it now?`)) {
-                onSetRepo(res.data.path)
+                onSetRepo(job.path)
             }
         } catch (err) {
             console.error('Failed to clone repo:', err)
-            alert(err.response?.data?.error || 'Failed to clone repository')
+            alert(err.response?.data?.error || err.message || 'Failed to clone repository')
         } finally {
             setCloningRepo(null)
         }
@@ -501,6 +526,17 @@ function RepoInput({ onSetRepo, currentPath, onReset, onUpdate }) {
                             <div style={{ marginTop: '10px', fontSize: '0.9em', width: '100%' }}>
                                 <div style={{ display: 'flex', justifyContent: 'space-between', alignItems: 'center', marginBottom: '8px' }}>
                                     <strong>GitHub Repositories:</strong>
+                                    <label
+                                        title="Without this, clones fetch only the last 100 commits of each branch"
+                                        style={{ display: 'flex', alignItems: 'center', gap: '4px', fontSize: '0.8em', color: '#8b949e', marginLeft: 'auto', marginRight: '8px' }}
+                                    >
+                                        <input
+                                            type="checkbox"
+                                            checked={cloneFullHistory}
+                                            onChange={(e) => setCloneFullHistory(e.target.checked)}
+                                        />
+                                        Full history
+                                    </label>
                                     <button
                                         type="button"
                                         onClick={fetchGithubRepos}
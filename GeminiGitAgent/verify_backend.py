@@ -1,52 +1,61 @@
-import urllib.request
+import http.client
 import json
 import time
 import sys
 import subprocess
 import os
 
-API_URL = "http://127.0.0.1:5000/api"
+API_HOST = "127.0.0.1"
+API_PORT = 5000
+API_PREFIX = "/api"
 
-def test_endpoint(name, url, method='GET', data=None):
-    print(f"Testing {name} ({url})...")
+def test_endpoint(conn, name, path, method='GET', data=None):
+    print(f"Testing {name} ({API_PREFIX}{path})...")
     try:
-        req = urllib.request.Request(url, method=method)
-        req.add_header('Content-Type', 'application/json')
-        
-        if data:
-            json_data = json.dumps(data).encode('utf-8')
-            req.data = json_data
-            
-        with urllib.request.urlopen(req) as response:
-            print(f"  Status: {response.status}")
-            print(f"  Response: {response.read().decode('utf-8')[:100]}...")
-            return True
-    except urllib.error.HTTPError as e:
-        print(f"  FAILED: HTTP Error {e.code}: {e.reason}")
-        print(f"  Error Body: {e.read().decode('utf-8')}")
-        return False
-    except urllib.error.URLError as e:
+        json_data = json.dumps(data).encode('utf-8') if data else None
+        conn.request(method, f"{API_PREFIX}{path}", body=json_data,
+                     headers={'Content-Type': 'application/json'})
+        response = conn.getresponse()
+        # Always drain the body so the connection can carry the next request
+        body = response.read().decode('utf-8')
+
+        if response.status >= 400:
+            print(f"  FAILED: HTTP Error {response.status}: {response.reason}\n"
+                  f"  Error Body: {body}")
+            return False
+
+        print(f"  Status: {response.status}\n"
+              f"  Response: {body[:100]}...")
+        return True
+    except (http.client.HTTPException, OSError) as e:
+        # Drop the broken socket; the next request reconnects
+        conn.close()
         print(f"  FAILED: {e}")
         return False
     except Exception as e:
+        conn.close()
         print(f"  ERROR: {e}")
         return False
 
 def main():
     print("--- Starting Backend Verification ---")
+    # One keep-alive connection shared by every check; the timeout leaves room for /chat's model call
+    conn = http.client.HTTPConnection(API_HOST, API_PORT, timeout=60)
     
     # 1. Test Status Endpoint (GET)
-    if not test_endpoint("Status", f"{API_URL}/status"):
+    if not test_endpoint(conn, "Status", "/status"):
         print("CRITICAL: Backend seems down or unreachable.")
         return
 
     # 2. Test Chat Endpoint (POST)
     chat_data = {"message": "Hello from test script"}
-    test_endpoint("Chat", f"{API_URL}/chat", method='POST', data=chat_data)
+    test_endpoint(conn, "Chat", "/chat", method='POST', data=chat_data)
 
     # 3. Test Poll Endpoint (POST)
     poll_data = {"force": True}
-    test_endpoint("Poll", f"{API_URL}/poll", method='POST', data=poll_data)
+    test_endpoint(conn, "Poll", "/poll", method='POST', data=poll_data)
+
+    conn.close()
 
 if __name__ == "__main__":
     main()
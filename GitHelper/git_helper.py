@@ -2,14 +2,48 @@ import subprocess
 import argparse
 import os
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 class GitHelper:
+    # Shared by every helper for running independent read-only queries concurrently
+    _pool = ThreadPoolExecutor(max_workers=4)
+
     def __init__(self, repo_path=None):
         self.cwd = repo_path if repo_path else os.getcwd()
         if not os.path.exists(self.cwd):
             print(f"Warning: Directory '{self.cwd}' does not exist.")
+        # Long-lived `git cat-file --batch` process, started on first use
+        self._cat_file_proc = None
+        self._cat_file_lock = threading.Lock()
+        # Futures for queries started early by prefetch(), consumed by run_command
+        self._prefetched = {}
+
+    def prefetch(self, commands):
+        """Start argv commands on the shared pool; run_command picks up their results.
+
+        Only use this for read-only queries whose output can't change before they
+        are consumed, e.g. a run of consecutive status/log lines in a DSL script.
+        """
+        for command in commands:
+            key = tuple(command)
+            if key not in self._prefetched:
+                self._prefetched[key] = self._pool.submit(self._run, command, False)
 
     def run_command(self, command, strip=True):
+        """Run an argv list directly, or a command string through the shell.
+
+        Git commands are passed as lists so no shell is spawned and arguments
+        need no quoting; strings are kept for user-supplied deploy commands.
+        """
+        if not isinstance(command, str):
+            future = self._prefetched.pop(tuple(command), None)
+            if future is not None:
+                output = future.result()
+                return output.strip() if strip and output is not None else output
+        return self._run(command, strip)
+
+    def _run(self, command, strip):
         try:
             result = subprocess.run(
                 command,
@@ -18,18 +52,112 @@ class GitHelper:
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 text=True,
-                shell=True
+                shell=isinstance(command, str)
             )
             return result.stdout.strip() if strip else result.stdout
         except subprocess.CalledProcessError as e:
             print(f"Error executing command: {command}")
             print(e.stderr)
             return None
+        except OSError as e:
+            # Without a shell, a missing executable raises instead of exiting non-zero
+            print(f"Error executing command: {command}")
+            print(e)
+            return None
+
+    def iter_records(self, command, separator="\0", chunk_size=65536):
+        """Run an argv list and yield its output split on `separator` as it arrives.
+
+        Records are yielded while git is still writing, so large outputs are
+        never held in memory all at once. Yields nothing if git cannot start.
+        """
+        try:
+            proc = subprocess.Popen(
+                command,
+                cwd=self.cwd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                encoding="utf-8",
+                errors="replace"
+            )
+        except OSError as e:
+            print(f"Error executing command: {command}")
+            print(e)
+            return
+        try:
+            pending = ""
+            while True:
+                chunk = proc.stdout.read(chunk_size)
+                if not chunk:
+                    break
+                *records, pending = (pending + chunk).split(separator)
+                yield from records
+            if pending:
+                yield pending
+        finally:
+            proc.stdout.close()
+            if proc.poll() is None:
+                proc.kill()
+            proc.wait()
+
+    def cat_file(self, spec):
+        """Look up an object like 'HEAD' or '<sha>:<path>'.
+
+        Returns (sha, type, data bytes), or None if it doesn't exist. Lookups
+        share one `git cat-file --batch` process instead of spawning git each time.
+        """
+        if "\n" in spec:
+            return None
+        with self._cat_file_lock:
+            try:
+                proc = self._cat_file_proc
+                if proc is None or proc.poll() is not None:
+                    proc = self._cat_file_proc = subprocess.Popen(
+                        ["git", "cat-file", "--batch"],
+                        cwd=self.cwd,
+                        stdin=subprocess.PIPE,
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.DEVNULL
+                    )
+                proc.stdin.write(spec.encode("utf-8") + b"\n")
+                proc.stdin.flush()
+                # "<sha> <type> <size>", or "<spec> missing" / "<spec> ambiguous"
+                header = proc.stdout.readline().split()
+                if len(header) != 3:
+                    return None
+                data = proc.stdout.read(int(header[2]))
+                proc.stdout.read(1)  # Trailing newline after the object
+                return header[0].decode("ascii"), header[1].decode("ascii"), data
+            except (OSError, ValueError):
+                self._close_cat_file()
+                return None
+
+    def _close_cat_file(self):
+        proc, self._cat_file_proc = self._cat_file_proc, None
+        if proc is not None:
+            try:
+                proc.stdin.close()
+                proc.wait(timeout=2)
+            except (OSError, subprocess.TimeoutExpired):
+                proc.kill()
+
+    def close(self):
+        """Stop the background cat-file process, if one was started."""
+        with self._cat_file_lock:
+            self._close_cat_file()
+
+    REPO_ROOT_COMMAND = ["git", "rev-parse", "--show-toplevel"]
+    STATUS_COMMAND = ["git", "status", "--porcelain", "-z"]
+
+    @staticmethod
+    def log_command(limit):
+        return ["git", "log", "--oneline", "-n", str(limit)]
 
     def get_current_repo(self):
         """Get the repo im currently in"""
         # git rev-parse --show-toplevel gives the absolute path to the root of the repo
-        repo_root = self.run_command("git rev-parse --show-toplevel")
+        repo_root = self.run_command(self.REPO_ROOT_COMMAND)
         if repo_root:
             repo_name = os.path.basename(repo_root)
             print(f"Current Repository: {repo_name} ({repo_root})")
@@ -40,7 +168,8 @@ class GitHelper:
 
     def list_changes(self):
         """List my changes and the # of changes"""
-        status_output = self.run_command("git status -s")
+        # -z keeps paths verbatim (no quoting, no ambiguity with newlines in names)
+        status_output = self.run_command(self.STATUS_COMMAND, strip=False)
         if status_output is None:
             return
 
@@ -48,13 +177,21 @@ class GitHelper:
             print("No changes found.")
             return
 
-        lines = status_output.split('\n')
-        count = len(lines)
-        
-        print(f"Number of changes: {count}")
-        print("Changes:")
-        for line in lines:
-            print(f"  {line}")
+        entries = status_output.split('\0')
+        changes = []
+        i = 0
+        while i < len(entries):
+            entry = entries[i]
+            i += 1
+            if not entry:
+                continue
+            # Renames and copies are followed by their original path as a separate field
+            if entry[0] in 'RC' or entry[1] in 'RC':
+                entry = f"{entry[:3]}{entries[i]} -> {entry[3:]}"
+                i += 1
+            changes.append(entry)
+
+        sys.stdout.write(f"Number of changes: {len(changes)}\nChanges:\n  " + "\n  ".join(changes) + "\n")
 
     def push_changes(self, message=None):
         """Push changes. If message is provided, commit first."""
@@ -62,7 +199,7 @@ class GitHelper:
             self.commit_changes(message)
 
         print("Pushing to remote...")
-        if self.run_command("git push") is not None:
+        if self.run_command(["git", "push"]) is not None:
             print("Successfully pushed changes.")
             return True
         return False
@@ -70,23 +207,23 @@ class GitHelper:
     def commit_changes(self, message="Auto-commit from GitHelper"):
         """Commit changes without pushing"""
         print("Staging all changes...")
-        if self.run_command("git add .") is None: return
+        if self.run_command(["git", "add", "."]) is None: return
 
         print(f"Committing with message: '{message}'...")
-        if self.run_command(f'git commit -m "{message}"') is None: return
+        if self.run_command(["git", "commit", "-m", message]) is None: return
         print("Successfully committed changes.")
 
     def pull_changes(self):
         """Pull changes"""
         print("Pulling latest changes...")
-        if self.run_command("git pull") is not None:
+        if self.run_command(["git", "pull"]) is not None:
             print("Successfully pulled changes.")
 
     def undo_last_commit(self):
         """Undo my last commit but keep changes"""
         print("Undoing last commit (keeping changes staged)...")
         # --soft keeps changes in staging area
-        if self.run_command("git reset --soft HEAD~1") is not None:
+        if self.run_command(["git", "reset", "--soft", "HEAD~1"]) is not None:
             print("Successfully undid last commit.")
 
     def deploy(self, deploy_command=None):
@@ -110,7 +247,7 @@ class GitHelper:
     def get_log(self, limit=10):
         """Get recent git log"""
         print(f"Getting last {limit} commits...")
-        log_output = self.run_command(f"git log --oneline -n {limit}")
+        log_output = self.run_command(self.log_command(limit))
         if log_output:
             print(log_output)
             return log_output
@@ -118,11 +255,12 @@ class GitHelper:
 
     def get_branch_info(self):
         """Get current branch info including upstream"""
-        # Use --show-current which works better for unborn branches
-        current_branch = self.run_command("git branch --show-current")
+        # Read the branch straight from .git/HEAD when it names one; otherwise
+        # use --show-current which works better for unborn branches
+        current_branch = self._head_branch() or self.run_command(["git", "branch", "--show-current"])
         if not current_branch:
              # Fallback
-             current_branch = self.run_command("git rev-parse --abbrev-ref HEAD")
+             current_branch = self.run_command(["git", "rev-parse", "--abbrev-ref", "HEAD"])
              
         if not current_branch:
             return None
@@ -130,7 +268,7 @@ class GitHelper:
         # Check for upstream
         # If branch is unborn (no commits), it can't have upstream
         try:
-            upstream = self.run_command(f"git rev-parse --abbrev-ref {current_branch}@{{u}}", strip=True)
+            upstream = self.run_command(["git", "rev-parse", "--abbrev-ref", f"{current_branch}@{{u}}"], strip=True)
         except:
             upstream = None
             
@@ -140,10 +278,20 @@ class GitHelper:
             "is_tracking": upstream is not None
         }
 
+    def _head_branch(self):
+        """Branch named by HEAD in a repo rooted at cwd, or None (detached, worktree, subdir)."""
+        try:
+            with open(os.path.join(self.cwd, ".git", "HEAD"), "r") as f:
+                head = f.read().strip()
+        except OSError:
+            return None
+        prefix = "ref: refs/heads/"
+        return head[len(prefix):] if head.startswith(prefix) else None
+
     def publish_branch(self, branch_name):
         """Publish branch to remote (git push -u)"""
         print(f"Publishing branch {branch_name}...")
-        if self.run_command(f"git push -u origin {branch_name}") is not None:
+        if self.run_command(["git", "push", "-u", "origin", branch_name]) is not None:
             print(f"Successfully published {branch_name}.")
             return True
         return False
@@ -151,6 +299,27 @@ class GitHelper:
 class DSLExecutor:
     def __init__(self, helper):
         self.helper = helper
+        # DSL command -> handler taking the (possibly None) argument
+        self._dispatch = {
+            'repo': lambda arg: helper.get_current_repo(),
+            'status': lambda arg: helper.list_changes(),
+            'push': helper.push_changes,
+            'commit': self._requires_arg(helper.commit_changes, "'commit' requires a message."),
+            'pull': lambda arg: helper.pull_changes(),
+            'undo': lambda arg: helper.undo_last_commit(),
+            'deploy': self._requires_arg(helper.deploy, "'deploy' requires a command."),
+            'cd': self._requires_arg(helper.change_directory, "'cd' requires a path."),
+            'log': lambda arg: helper.get_log(int(arg) if arg and arg.isdigit() else 10),
+        }
+
+    @staticmethod
+    def _requires_arg(handler, message):
+        def run(arg):
+            if arg:
+                handler(arg)
+            else:
+                print(f"Error: {message}")
+        return run
 
     def execute_script(self, file_path):
         if not os.path.exists(file_path):
@@ -159,49 +328,54 @@ class DSLExecutor:
 
         print(f"Executing DSL script: {file_path}")
         with open(file_path, 'r') as f:
-            lines = f.readlines()
+            source = f.read()
+
+        self.execute_source(source)
+
+    def execute_source(self, source):
+        """Execute DSL commands from a string, one per line"""
+        lines = [(i, line.strip()) for i, line in enumerate(source.splitlines())]
+        lines = [(i, line) for i, line in lines if line and not line.startswith('#')]
+
+        for n, (i, line) in enumerate(lines):
+            # At the start of a run of read-only lines, start all their git queries
+            # at once; the lines still execute and print in order below.
+            if self._query_for(line) and (n == 0 or not self._query_for(lines[n - 1][1])):
+                run = []
+                for _, following in lines[n:]:
+                    query = self._query_for(following)
+                    if not query:
+                        break
+                    run.append(query)
+                if len(run) > 1:
+                    self.helper.prefetch(run)
 
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if not line or line.startswith('#'):
-                continue
-            
             print(f"\n[Line {i+1}] Executing: {line}")
             self._execute_line(line)
 
-    def _execute_line(self, line):
+    @staticmethod
+    def _parse_line(line):
         parts = line.split(' ', 1)
         command = parts[0].lower()
         arg = parts[1].strip().strip('"').strip("'") if len(parts) > 1 else None
+        return command, arg
 
+    def _query_for(self, line):
+        """The git query behind a read-only DSL line, or None if it may change state."""
+        command, arg = self._parse_line(line)
         if command == 'repo':
-            self.helper.get_current_repo()
-        elif command == 'status':
-            self.helper.list_changes()
-        elif command == 'push':
-            self.helper.push_changes(arg)
-        elif command == 'commit':
-            if arg:
-                self.helper.commit_changes(arg)
-            else:
-                print("Error: 'commit' requires a message.")
-        elif command == 'pull':
-            self.helper.pull_changes()
-        elif command == 'undo':
-            self.helper.undo_last_commit()
-        elif command == 'deploy':
-            if arg:
-                self.helper.deploy(arg)
-            else:
-                print("Error: 'deploy' requires a command.")
-        elif command == 'cd':
-            if arg:
-                self.helper.change_directory(arg)
-            else:
-                print("Error: 'cd' requires a path.")
-        elif command == 'log':
-            limit = int(arg) if arg and arg.isdigit() else 10
-            self.helper.get_log(limit)
+            return GitHelper.REPO_ROOT_COMMAND
+        if command == 'status':
+            return GitHelper.STATUS_COMMAND
+        if command == 'log':
+            return GitHelper.log_command(int(arg) if arg and arg.isdigit() else 10)
+        return None
+
+    def _execute_line(self, line):
+        command, arg = self._parse_line(line)
+        handler = self._dispatch.get(command)
+        if handler:
+            handler(arg)
         else:
             print(f"Error: Unknown command '{command}'")
 
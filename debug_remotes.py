@@ -1,21 +1,31 @@
 import subprocess
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+print_lock = threading.Lock()
 
 def check_remote(path):
-    print(f"Checking {path}...")
+    lines = [f"Checking {path}..."]
     if not os.path.exists(path):
-        print("Path does not exist")
-        return
-    
-    try:
-        result = subprocess.run(["git", "remote", "-v"], cwd=path, capture_output=True, text=True)
-        print(result.stdout)
-        print(result.stderr)
-    except Exception as e:
-        print(f"Error: {e}")
+        lines.append("Path does not exist")
+    else:
+        try:
+            result = subprocess.run(["git", "remote", "-v"], cwd=path, capture_output=True, text=True)
+            lines.append(result.stdout)
+            lines.append(result.stderr)
+        except Exception as e:
+            lines.append(f"Error: {e}")
+
+    # Each repo's report is printed in one piece so concurrent checks don't interleave
+    with print_lock:
+        print("\n".join(lines))
 
 base_dir = os.path.dirname(os.getcwd())
 # Assuming we are in a:\Github\AI-Agent, base_dir is a:\Github
 
-check_remote(os.path.join(base_dir, "AI-Agent-TestRepo"))
-check_remote(os.path.join(base_dir, "Assignment1"))
+candidates = [e.path for e in os.scandir(base_dir)
+              if e.is_dir() and os.path.isdir(os.path.join(e.path, '.git'))]
+
+with ThreadPoolExecutor(max_workers=8) as pool:
+    list(pool.map(check_remote, candidates))
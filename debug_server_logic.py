@@ -1,8 +1,34 @@
 import subprocess
 import os
+import re
+import functools
+
+# Owner segment of an HTTPS (github.com/org/) or SSH (github.com:org/) remote URL
+_ORG_RE = re.compile(r'github\.com[:/]([^/]+)/')
 
 def get_github_organization(repo_path):
     print(f"Testing {repo_path}...")
+    # Key the cache on the config's mtime so an edited remote is picked up
+    try:
+        config_mtime = os.stat(os.path.join(repo_path, '.git', 'config')).st_mtime_ns
+    except OSError:
+        config_mtime = None
+
+    remote_url, diagnostics = _get_remote_url(repo_path, config_mtime)
+    # Diagnostics are printed here rather than in the cached function, so a
+    # cache hit still shows what the lookup found
+    for line in diagnostics:
+        print(line)
+    if remote_url:
+        print(f"Remote URL: {remote_url}")
+
+    m = _ORG_RE.search(remote_url) if remote_url else None
+    return m.group(1) if m else None
+
+@functools.lru_cache(maxsize=256)
+def _get_remote_url(repo_path, config_mtime):
+    """Return (origin URL or None, diagnostic lines). Pure: prints nothing."""
+    diagnostics = []
     try:
         # Try to get the remote URL
         result = subprocess.run(
@@ -13,61 +39,36 @@ def get_github_organization(repo_path):
             timeout=2
         )
         
-        if result.returncode != 0:
-            print("git remote get-url failed, trying -v")
-            # Try alternative: git remote -v
-            result = subprocess.run(
-                ["git", "remote", "-v"],
-                cwd=repo_path,
-                capture_output=True,
-                text=True,
-                timeout=2
-            )
-            if result.returncode != 0 or not result.stdout:
-                print("git remote -v failed")
-                return None
-            
-            # Parse output like "origin  https://github.com/org/repo.git (fetch)"
-            lines = result.stdout.strip().split('\n')
-            for line in lines:
-                if 'origin' in line and ('github.com' in line or 'git@github.com' in line):
-                    # Extract URL part
-                    parts = line.split()
-                    if len(parts) >= 2:
-                        remote_url = parts[1]
-                        break
-            else:
-                print("No github origin found in -v output")
-                return None
-        else:
-            remote_url = result.stdout.strip()
-        
-        print(f"Remote URL: {remote_url}")
-        
-        if not remote_url:
-            return None
-        
-        if 'github.com' in remote_url:
-            # Extract the org/repo part
-            if 'github.com/' in remote_url:
-                # HTTPS format
-                parts = remote_url.split('github.com/')
-                if len(parts) > 1:
-                    org_repo = parts[1].rstrip('/').rstrip('.git')
-                    org = org_repo.split('/')[0] if '/' in org_repo else None
-                    return org
-            elif 'github.com:' in remote_url:
-                # SSH format
-                parts = remote_url.split('github.com:')
-                if len(parts) > 1:
-                    org_repo = parts[1].rstrip('/').rstrip('.git')
-                    org = org_repo.split('/')[0] if '/' in org_repo else None
-                    return org
+        if result.returncode == 0:
+            return result.stdout.strip(), tuple(diagnostics)
+
+        diagnostics.append("git remote get-url failed, trying -v")
+        # Try alternative: git remote -v
+        result = subprocess.run(
+            ["git", "remote", "-v"],
+            cwd=repo_path,
+            capture_output=True,
+            text=True,
+            timeout=2
+        )
+        if result.returncode != 0 or not result.stdout:
+            diagnostics.append("git remote -v failed")
+            return None, tuple(diagnostics)
         
-        return None
+        # Parse output like "origin  https://github.com/org/repo.git (fetch)"
+        lines = result.stdout.strip().split('\n')
+        for line in lines:
+            if 'origin' in line and ('github.com' in line or 'git@github.com' in line):
+                # Extract URL part
+                parts = line.split()
+                if len(parts) >= 2:
+                    return parts[1], tuple(diagnostics)
+
+        diagnostics.append("No github origin found in -v output")
+        return None, tuple(diagnostics)
     except Exception as e:
-        print(f"Exception: {e}")
-        return None
+        diagnostics.append(f"Exception: {e}")
+        return None, tuple(diagnostics)
 
 base_dir = os.path.dirname(os.getcwd())
 # Assuming we are in a:\Github\AI-Agent, base_dir is a:\Github
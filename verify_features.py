@@ -1,13 +1,18 @@
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import os
 
 API_URL = "http://127.0.0.1:5000/api"
 
+# One keep-alive connection pool for every check instead of a new socket per call
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=8))
+
 def test_org_grouping():
     print("Testing Organization Grouping...")
     try:
-        res = requests.get(f"{API_URL}/repos")
+        res = SESSION.get(f"{API_URL}/repos")
         data = res.json()
         
         by_org = data.get("by_organization", {})
@@ -35,7 +40,7 @@ def test_readme_generation():
     # 1. Set Repo
     print(f"Setting repo to: {repo_path}")
     try:
-        res = requests.post(f"{API_URL}/set-repo", json={"path": repo_path})
+        res = SESSION.post(f"{API_URL}/set-repo", json={"path": repo_path})
         if res.status_code != 200:
             print(f"Failed to set repo: {res.text}")
             return
@@ -46,7 +51,7 @@ def test_readme_generation():
     # 2. Generate README
     print("Triggering README generation...")
     try:
-        res = requests.post(f"{API_URL}/generate-readme")
+        res = SESSION.post(f"{API_URL}/generate-readme")
         if res.status_code == 200:
             print("SUCCESS: README generation API returned success.")
             print(f"Response: {res.json().get('message')}")
@@ -57,7 +62,7 @@ def test_readme_generation():
                 print(f"SUCCESS: README.md file exists at {readme_path}")
                 # Optional: Print first few lines
                 with open(readme_path, 'r') as f:
-                    print(f"Content preview:\n{f.read()[:100]}...")
+                    print(f"Content preview:\n{f.read(100)}...")
             else:
                 print("FAILURE: README.md file not found after generation.")
         else: